@@ -0,0 +1 @@
+"""Performance tooling, run from the repository root with src on the path"""
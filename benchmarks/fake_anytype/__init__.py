@@ -0,0 +1,22 @@
+"""Local Anytype API stand-in for benchmarks and fault testing"""
+
+from benchmarks.fake_anytype.fixtures import (
+    build_journal_space,
+    build_task_space,
+    build_workspace,
+    reference_space,
+)
+from benchmarks.fake_anytype.server import FakeAnytype, FaultProfile, Faults
+from benchmarks.fake_anytype.store import FakeSpace, FakeStore
+
+__all__ = [
+    "FakeAnytype",
+    "FakeSpace",
+    "FakeStore",
+    "FaultProfile",
+    "Faults",
+    "build_journal_space",
+    "build_task_space",
+    "build_workspace",
+    "reference_space",
+]
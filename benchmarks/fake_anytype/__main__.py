@@ -0,0 +1,79 @@
+"""
+Runs the stand-in on localhost, point the app at it with
+ANYTYPE_URL, ANYTYPE_PORT and ANYTYPE_KEY
+
+    python -m benchmarks.fake_anytype --tasks 10000 --latency 0.02 --error-429 0.01
+"""
+
+import argparse
+import json
+
+from benchmarks.fake_anytype.fixtures import build_workspace
+from benchmarks.fake_anytype.server import FakeAnytype, FaultProfile, Faults
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=31012)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--token", default=None, help="Require this bearer token")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Seconds")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Probability")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Seconds")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="Probability")
+    parser.add_argument("--drop", type=float, default=0.0, help="Probability")
+    parser.add_argument("--max-rps", type=float, default=0.0, help="Per route")
+    parser.add_argument(
+        "--route",
+        action="append",
+        default=[],
+        metavar="'METHOD /route/{id}'=JSON",
+        help="Fault profile for one route, e.g. "
+        "'GET /v1/spaces/{id}/objects/{id}={\"latency\": 0.1}'",
+    )
+    parser.add_argument(
+        "--data", default=None, help="Write matching reference data as JSON here"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    routes = {
+        "*": FaultProfile(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_429=args.error_429,
+            retry_after=args.retry_after,
+            error_5xx=args.error_5xx,
+            drop=args.drop,
+            max_rps=args.max_rps,
+        )
+    }
+    for entry in args.route:
+        name, _, profile = entry.partition("=")
+        routes[name] = FaultProfile(**json.loads(profile))
+
+    store, reference = build_workspace(args.tasks, args.seed)
+    if args.data:
+        with open(args.data, "w", encoding="utf-8") as file:
+            json.dump({"anytype": reference}, file, indent=2)
+
+    fake = FakeAnytype(store, Faults(routes, args.seed), args.host, args.port)
+    fake.token = args.token
+    print(f"Fake Anytype on {fake.url}")
+    for name, space in reference.items():
+        print(f"  {name} space: {space['id']}")
+    try:
+        fake.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
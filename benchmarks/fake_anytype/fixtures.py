@@ -0,0 +1,216 @@
+"""Seeded fixture generator for task and journal spaces of any size"""
+
+from datetime import datetime, timedelta, timezone
+import random
+
+from benchmarks.fake_anytype.store import DATETIME_FORMAT, FakeSpace, FakeStore
+
+STATUSES = ["Ready", "Doing", "Done", "Skipped", "Blocked", "Timed"]
+CLOSED = ("Done", "Skipped")
+
+RATES = [
+    "1-day",
+    "2-day@0930",
+    "1-week:mon,thu@14",
+    "1-weekday",
+    "1-weekend@10",
+    "1-month:15",
+    "1-month:-1",
+    "1-quarter",
+    "1-year",
+]
+
+
+def _closed(store: FakeStore, space: FakeSpace, obj: dict) -> bool:
+    return store.value(space, obj, "status") in CLOSED
+
+
+def done_view(store, space, obj):
+    return obj["type_key"] == "task" and _closed(store, space, obj)
+
+
+def timer_view(store, space, obj):
+    return obj["type_key"] == "task" and not _closed(store, space, obj)
+
+
+def habits_view(store, space, obj):
+    return obj["type_key"] == "habit"
+
+
+def overdue_view(store, space, obj):
+    due = obj["values"].get("due_date")
+    if obj["type_key"] != "task" or not due or _closed(store, space, obj):
+        return False
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0)
+    return due < today.strftime(DATETIME_FORMAT)
+
+
+AUTOMATION_VIEWS = {
+    "Done": done_view,
+    "Timer": timer_view,
+    "Habits": habits_view,
+    "Overdue": overdue_view,
+}
+
+
+def _base_types(store: FakeStore, space: FakeSpace):
+    store.add_type(space, "Page", "page", layout="basic")
+    store.add_type(space, "Collection", "collection", layout="collection")
+    store.add_type(space, "Query", "query", layout="set")
+
+
+def build_task_space(
+    store: FakeStore,
+    tasks: int = 100,
+    habits: int | None = None,
+    done_ratio: float = 0.3,
+    overdue_ratio: float = 0.2,
+    once_ratio: float = 0.2,
+    seed: int = 0,
+    space_id: str | None = None,
+) -> FakeSpace:
+    """
+    Builds a task space shaped like the one TaskService expects,
+    with an Automation query holding Done, Timer, Habits and Overdue views
+    """
+    rand = random.Random(seed)
+    space = store.add_space("tasks", space_id)
+    habits = max(tasks // 10, 1) if habits is None else habits
+
+    store.add_prop(space, "Status", "status", "select", STATUSES)
+    store.add_prop(space, "Rate", "rate", "text")
+    store.add_prop(space, "Due date", "due_date", "date")
+    store.add_prop(space, "Reset Count", "reset_count", "number")
+    store.add_prop(space, "Count", "count", "number")
+    store.add_prop(space, "Timer", "timer", "url")
+    store.add_prop(space, "URL", "url", "url")
+    store.add_prop(space, "Focus", "focus", "text")
+    store.add_prop(space, "AoC", "aoc", "select", ["Health", "Home", "Work", "Play"])
+    store.add_prop(
+        space, "Project", "project", "select", [f"Project {n}" for n in range(8)]
+    )
+    store.add_prop(space, "Tags", "tags", "multiselect", ["quick", "deep", "errand"])
+
+    _base_types(store, space)
+    task_props = ["status", "rate", "due_date", "reset_count", "timer", "aoc"]
+    store.add_type(space, "Task", "task", task_props, templates=["Default"])
+    store.add_type(space, "Habit", "habit", ["status", "count", "url", "rate"])
+    store.add_type(space, "Project", "project", ["status"], layout="basic")
+
+    status = {name: store.tag_by_name(space, "status", name)["id"] for name in STATUSES}
+    aoc = [tag["id"] for tag in space.tags[space.props["aoc"]["id"]].values()]
+    projects = [tag["id"] for tag in space.tags[space.props["project"]["id"]].values()]
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    for index in range(tasks):
+        roll = rand.random()
+        if roll < done_ratio:
+            state = rand.choice(CLOSED)
+            due = now - timedelta(hours=rand.randint(0, 48))
+        elif roll < done_ratio + overdue_ratio:
+            state = "Ready"
+            due = now - timedelta(days=rand.randint(1, 10))
+        else:
+            state = rand.choice(["Ready", "Doing", "Timed", "Blocked"])
+            due = now + timedelta(days=rand.randint(0, 30))
+        values = {
+            "status": status[state],
+            "due_date": due.strftime(DATETIME_FORMAT),
+            "aoc": rand.choice(aoc),
+            "project": rand.choice(projects),
+            "focus": rand.choice(["music", "silence", "podcast"]),
+        }
+        if rand.random() >= once_ratio:
+            values["rate"] = rand.choice(RATES)
+        if rand.random() < 0.3:
+            values["reset_count"] = rand.randint(0, 4)
+        store.add_object(space, "task", f"Task {index}", values)
+
+    for index in range(habits):
+        store.add_object(
+            space,
+            "habit",
+            f"Habit {index}",
+            {
+                "status": status["Ready"],
+                "count": rand.randint(0, 100),
+                "rate": "1-day",
+            },
+        )
+
+    store.add_list(space, "Automation", AUTOMATION_VIEWS)
+    return space
+
+
+def build_journal_space(store: FakeStore, space_id: str | None = None) -> FakeSpace:
+    """Builds a journal space with the entry, log and prompt types JournalService uses"""
+    space = store.add_space("journal", space_id)
+    store.add_prop(space, "Log Type", "log_type", "select", ["Task", "Habit"])
+    store.add_prop(space, "Logged", "logged", "date")
+    store.add_prop(space, "Metadata", "metadata", "text")
+    store.add_prop(space, "URL", "url", "url")
+
+    _base_types(store, space)
+    store.add_type(space, "Entry", "entry", templates=["Day"])
+    store.add_type(space, "Log", "log", ["log_type", "logged", "metadata"])
+    store.add_type(space, "Prompt", "prompt", ["url"], templates=["Task Review"])
+    return space
+
+
+def reference_space(store: FakeStore, space: FakeSpace) -> dict:
+    """SpaceData shaped dict for the app's data.yaml, as scan_space would build it"""
+    types = {}
+    for type_id, type_obj in space.types.items():
+        types[type_obj["name"]] = {
+            "id": type_id,
+            "key": type_obj["key"],
+            "templates": {
+                template["name"]: template["id"]
+                for template in space.templates[type_id]
+            },
+        }
+    props = {}
+    for prop in space.props.values():
+        props[prop["name"]] = {
+            "id": prop["id"],
+            "key": prop["key"],
+            "name": prop["name"],
+            "format": prop["format"],
+        }
+        if prop["format"] in ["select", "multiselect"]:
+            props[prop["name"]]["options"] = {
+                tag["name"]: {
+                    "id": tag["id"],
+                    "key": tag["key"],
+                    "name": tag["name"],
+                    "color": tag["color"],
+                }
+                for tag in space.tags[prop["id"]].values()
+            }
+    queries = {}
+    for list_id, list_data in space.lists.items():
+        query = {"id": list_id}
+        for view in list_data["views"]:
+            query[view["name"]] = view["id"]
+        queries[space.objects[list_id]["name"]] = query
+    return {"id": space.id, "queries": queries, "types": types, "props": props}
+
+
+def build_workspace(
+    tasks: int = 100, seed: int = 0, journal: bool = True, target: bool = False
+):
+    """
+    Store with a task space, optionally a journal space
+    and an empty task shaped target space for migrations, plus reference data
+    """
+    store = FakeStore(seed)
+    task_space = build_task_space(store, tasks=tasks, seed=seed)
+    reference = {"tasks": reference_space(store, task_space)}
+    if journal:
+        journal_space = build_journal_space(store)
+        reference["journal"] = reference_space(store, journal_space)
+    if target:
+        target_space = build_task_space(store, tasks=0, habits=0, seed=seed)
+        target_space.name = "target"
+        reference["target"] = reference_space(store, target_space)
+    return store, reference
@@ -0,0 +1,528 @@
+"""
+Stand-in for the Anytype local API with per route latency and fault injection,
+served from a background thread so benchmarks can run in process
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import operator
+import random
+import re
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.fake_anytype.store import FakeStore
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# Search sorts and filters understand the object fields behind these keys
+SEARCH_FIELDS = {
+    "created_date": "created",
+    "last_modified_date": "modified",
+    "name": "name",
+}
+CONDITIONS = {
+    "eq": operator.eq,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+
+@dataclass
+class FaultProfile:
+    """
+    Behaviour of one route, probabilities are per request.
+    max_rps answers 429 once a route exceeds that many requests a second
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_429: float = 0.0
+    retry_after: float | None = 1.0
+    error_5xx: float = 0.0
+    status_5xx: int = 503
+    drop: float = 0.0
+    max_rps: float = 0.0
+
+
+@dataclass
+class Faults:
+    """Fault profiles keyed by 'METHOD /route/{id}', '*' applies to the rest"""
+
+    routes: dict[str, FaultProfile] = field(default_factory=dict)
+    seed: int | None = None
+
+    def __post_init__(self):
+        self.random = random.Random(self.seed)
+        self.lock = threading.Lock()
+        self.windows: dict[str, tuple[float, int]] = {}
+
+    def profile(self, route: str) -> FaultProfile:
+        return self.routes.get(route) or self.routes.get("*") or FaultProfile()
+
+    def roll(self) -> float:
+        with self.lock:
+            return self.random.random()
+
+    def over_rate(self, route: str, profile: FaultProfile) -> bool:
+        """Fixed one second window counter per route"""
+        if profile.max_rps <= 0:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            start, count = self.windows.get(route, (now, 0))
+            if now - start >= 1:
+                start, count = now, 0
+            self.windows[route] = (start, count + 1)
+            return count + 1 > profile.max_rps
+
+
+ROUTES = []
+
+
+def route(method: str, template: str):
+    """Registers a handler for a route template, ids become named groups"""
+    pattern = "^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", template) + "/?$"
+    generic = re.sub(r"\{\w+\}", "{id}", template)
+
+    def decorator(func):
+        ROUTES.append((method, re.compile(pattern), f"{method} {generic}", func))
+        return func
+
+    return decorator
+
+
+def paginate(items: list, query: dict) -> dict:
+    offset = int(query.get("offset", 0))
+    limit = min(int(query.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+    page = items[offset : offset + limit]
+    return {
+        "data": page,
+        "pagination": {
+            "total": len(items),
+            "offset": offset,
+            "limit": limit,
+            "has_more": offset + limit < len(items),
+        },
+    }
+
+
+class NotFound(Exception):
+    pass
+
+
+def _space(store: FakeStore, space_id: str):
+    space = store.space(space_id)
+    if space is None:
+        raise NotFound(f"space {space_id}")
+    return space
+
+
+def _object(space, object_id: str) -> dict:
+    obj = space.objects.get(object_id)
+    if obj is None or obj["archived"]:
+        raise NotFound(f"object {object_id}")
+    return obj
+
+
+@route("POST", "/v1/spaces/{space}/search")
+def search(store, params, query, body):
+    space = _space(store, params["space"])
+    types = set((body or {}).get("types") or [])
+    text = ((body or {}).get("query") or "").lower()
+    found = []
+    for obj in space.objects.values():
+        if obj["archived"]:
+            continue
+        if types:
+            type_obj = store.type_by_key(space, obj["type_key"])
+            if obj["type_key"] not in types and type_obj["id"] not in types:
+                continue
+        if text and text not in obj["name"].lower():
+            continue
+        if not _matches(obj, (body or {}).get("filters")):
+            continue
+        found.append(obj)
+    sort = (body or {}).get("sort")
+    if sort and sort.get("property_key") in SEARCH_FIELDS:
+        found.sort(
+            key=lambda obj: obj[SEARCH_FIELDS[sort["property_key"]]],
+            reverse=sort.get("direction") == "desc",
+        )
+    page = paginate(found, query)
+    page["data"] = [store.render_object(space, obj) for obj in page["data"]]
+    return 200, page
+
+
+def _matches(obj: dict, filters: dict | None) -> bool:
+    """Applies and-ed search conditions on the searchable fields"""
+    for condition in (filters or {}).get("conditions") or []:
+        field_name = SEARCH_FIELDS.get(condition.get("property_key"))
+        compare = CONDITIONS.get(condition.get("condition"))
+        if field_name is None or compare is None:
+            continue
+        value = condition.get("date", condition.get("text"))
+        if not compare(obj[field_name], value):
+            return False
+    return True
+
+
+@route("POST", "/v1/spaces/{space}/objects")
+def create_object(store, params, query, body):
+    space = _space(store, params["space"])
+    if store.type_by_key(space, body.get("type_key", "")) is None:
+        return 400, {"message": f"unknown type {body.get('type_key')}"}
+    obj = store.add_object(space, body["type_key"], body.get("name", ""))
+    obj["markdown"] = body.get("body") or ""
+    store.apply_properties(space, obj, body.get("properties"))
+    return 200, {"object": store.render_object(space, obj, True)}
+
+
+@route("GET", "/v1/spaces/{space}/objects/{object}")
+def get_object(store, params, query, body):
+    space = _space(store, params["space"])
+    obj = _object(space, params["object"])
+    return 200, {"object": store.render_object(space, obj, True)}
+
+
+@route("PATCH", "/v1/spaces/{space}/objects/{object}")
+def update_object(store, params, query, body):
+    space = _space(store, params["space"])
+    obj = _object(space, params["object"])
+    if "name" in body:
+        obj["name"] = body["name"]
+    store.apply_properties(space, obj, body.get("properties"))
+    return 200, {"object": store.render_object(space, obj, True)}
+
+
+@route("DELETE", "/v1/spaces/{space}/objects/{object}")
+def delete_object(store, params, query, body):
+    space = _space(store, params["space"])
+    obj = _object(space, params["object"])
+    obj["archived"] = True
+    return 200, {"object": store.render_object(space, obj)}
+
+
+@route("GET", "/v1/spaces/{space}/lists/{list}/views")
+def list_views(store, params, query, body):
+    space = _space(store, params["space"])
+    list_data = space.lists.get(params["list"])
+    if list_data is None:
+        raise NotFound(f"list {params['list']}")
+    views = [store.render_view(view) for view in list_data["views"]]
+    return 200, paginate(views, query)
+
+
+@route("GET", "/v1/spaces/{space}/lists/{list}/views/{view}/objects")
+def view_objects(store, params, query, body):
+    space = _space(store, params["space"])
+    objects = store.view_objects(space, params["list"], params["view"])
+    if objects is None:
+        raise NotFound(f"view {params['view']}")
+    rendered = [store.render_object(space, obj) for obj in objects]
+    return 200, paginate(rendered, query)
+
+
+@route("GET", "/v1/spaces/{space}/types")
+def list_types(store, params, query, body):
+    space = _space(store, params["space"])
+    return 200, paginate(list(space.types.values()), query)
+
+
+@route("POST", "/v1/spaces/{space}/types")
+def create_type(store, params, query, body):
+    space = _space(store, params["space"])
+    props = [p["key"] for p in body.get("properties", []) if p["key"] in space.props]
+    type_obj = store.add_type(
+        space, body["name"], body["key"], props, body.get("layout", "basic")
+    )
+    return 200, {"type": type_obj}
+
+
+@route("PATCH", "/v1/spaces/{space}/types/{type}")
+def update_type(store, params, query, body):
+    space = _space(store, params["space"])
+    type_obj = space.types.get(params["type"])
+    if type_obj is None:
+        raise NotFound(f"type {params['type']}")
+    for key in ("name", "plural_name", "layout", "icon"):
+        if key in body:
+            type_obj[key] = body[key]
+    return 200, {"type": type_obj}
+
+
+@route("DELETE", "/v1/spaces/{space}/types/{type}")
+def delete_type(store, params, query, body):
+    space = _space(store, params["space"])
+    type_obj = space.types.pop(params["type"], None)
+    if type_obj is None:
+        raise NotFound(f"type {params['type']}")
+    space.templates.pop(params["type"], None)
+    return 200, {"type": type_obj}
+
+
+@route("GET", "/v1/spaces/{space}/types/{type}/templates")
+def list_templates(store, params, query, body):
+    space = _space(store, params["space"])
+    if params["type"] not in space.templates:
+        raise NotFound(f"type {params['type']}")
+    return 200, paginate(space.templates[params["type"]], query)
+
+
+@route("GET", "/v1/spaces/{space}/properties")
+def list_props(store, params, query, body):
+    space = _space(store, params["space"])
+    props = [store.render_prop(prop) for prop in space.props.values()]
+    return 200, paginate(props, query)
+
+
+@route("POST", "/v1/spaces/{space}/properties")
+def create_prop(store, params, query, body):
+    space = _space(store, params["space"])
+    prop = store.add_prop(space, body["name"], body["key"], body["format"])
+    return 200, {"property": store.render_prop(prop)}
+
+
+@route("DELETE", "/v1/spaces/{space}/properties/{prop}")
+def delete_prop(store, params, query, body):
+    space = _space(store, params["space"])
+    for key, prop in list(space.props.items()):
+        if prop["id"] == params["prop"]:
+            del space.props[key]
+            space.tags.pop(prop["id"], None)
+            return 200, {"property": store.render_prop(prop)}
+    raise NotFound(f"property {params['prop']}")
+
+
+def _prop_by_id(space, prop_id: str) -> dict:
+    for prop in space.props.values():
+        if prop["id"] == prop_id:
+            return prop
+    raise NotFound(f"property {prop_id}")
+
+
+@route("GET", "/v1/spaces/{space}/properties/{prop}/tags")
+def list_tags(store, params, query, body):
+    space = _space(store, params["space"])
+    prop = _prop_by_id(space, params["prop"])
+    return 200, paginate(list(space.tags[prop["id"]].values()), query)
+
+
+@route("POST", "/v1/spaces/{space}/properties/{prop}/tags")
+def create_tag(store, params, query, body):
+    space = _space(store, params["space"])
+    prop = _prop_by_id(space, params["prop"])
+    tag = store.add_tag(space, prop["id"], body["name"], body.get("color", "grey"))
+    return 200, {"tag": tag}
+
+
+@route("PUT", "/timetagger/api/v2/records")
+def put_records(store, params, query, body):
+    # Timetagger side car, accepts everything
+    keys = [record.get("key") for record in body or []]
+    return 200, {"accepted": keys, "failed": [], "errors": []}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_Server"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PATCH(self):
+        self.dispatch("PATCH")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def dispatch(self, method: str):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        split = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(split.query).items()}
+        if split.path.startswith("/_fake/"):
+            self.control(method, split.path)
+            return
+
+        matched = None
+        for route_method, pattern, template, func in ROUTES:
+            found = pattern.match(split.path)
+            if found and route_method == method:
+                matched = (template, func, found.groupdict())
+                break
+        template = matched[0] if matched else f"{method} {split.path}"
+        fake.count(template)
+
+        profile = fake.faults.profile(template)
+        delay = profile.latency + fake.faults.roll() * profile.jitter
+        if delay:
+            time.sleep(delay)
+        if profile.drop and fake.faults.roll() < profile.drop:
+            # Hang up without answering, the client sees a dropped connection
+            self.close_connection = True
+            return
+        if fake.faults.over_rate(template, profile) or (
+            profile.error_429 and fake.faults.roll() < profile.error_429
+        ):
+            headers = {}
+            if profile.retry_after is not None:
+                headers["Retry-After"] = f"{profile.retry_after:g}"
+            self.reply(429, {"message": "rate limit exceeded"}, headers)
+            return
+        if profile.error_5xx and fake.faults.roll() < profile.error_5xx:
+            self.reply(profile.status_5xx, {"message": "injected failure"})
+            return
+
+        if (
+            fake.token
+            and split.path.startswith("/v1/")
+            and self.headers.get("Authorization") != "Bearer " + fake.token
+        ):
+            self.reply(401, {"message": "unauthorized"})
+            return
+        if matched is None:
+            self.reply(404, {"message": f"no route {method} {split.path}"})
+            return
+        try:
+            body = json.loads(raw) if raw else {}
+            with fake.store.lock:
+                status, payload = matched[1](fake.store, matched[2], query, body)
+        except NotFound as err:
+            status, payload = 404, {"message": f"{err} not found"}
+        except (KeyError, ValueError) as err:
+            status, payload = 400, {"message": f"bad request: {err}"}
+        self.reply(status, payload)
+
+    def control(self, method: str, path: str):
+        """Uncounted routes for harnesses running the server out of process"""
+        fake = self.server.fake
+        if method == "GET" and path == "/_fake/calls":
+            with fake._calls_lock:
+                self.reply(200, {"calls": dict(fake.calls)})
+        elif method == "DELETE" and path == "/_fake/calls":
+            fake.reset_calls()
+            self.reply(200, {"calls": {}})
+        elif method == "POST" and path == "/_fake/reset":
+            fake.reset()
+            self.reply(200, {"reset": True})
+        else:
+            self.reply(404, {"message": f"no control route {method} {path}"})
+
+    def reply(self, status: int, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    fake: "FakeAnytype"
+
+
+class FakeAnytype:
+    """
+    Serves a FakeStore over HTTP on localhost.
+    calls counts every request received by 'METHOD /route/{id}',
+    a factory lets reset rebuild the fixtures between runs
+    """
+
+    def __init__(
+        self,
+        store: FakeStore | None = None,
+        faults: Faults | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        token: str | None = None,
+        factory=None,
+    ):
+        self.factory = factory
+        self.store = store if store is not None else factory()
+        self.faults = faults or Faults()
+        self.token = token
+        self.calls: Counter = Counter()
+        self._calls_lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def count(self, template: str):
+        with self._calls_lock:
+            self.calls[template] += 1
+
+    def reset_calls(self):
+        with self._calls_lock:
+            self.calls.clear()
+
+    def reset(self):
+        """Restores the fixtures when built from a factory and clears the counts"""
+        if self.factory is not None:
+            store = self.factory()
+            with self.store.lock:
+                self.store = store
+        self.reset_calls()
+
+    def total_calls(self) -> int:
+        with self._calls_lock:
+            return sum(self.calls.values())
+
+    def start(self) -> "FakeAnytype":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-anytype", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
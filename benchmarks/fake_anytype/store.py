@@ -0,0 +1,301 @@
+"""In-memory model of the Anytype spaces the fake server serves"""
+
+from datetime import datetime, timezone
+import itertools
+import random
+import string
+import threading
+
+DATETIME_FORMAT = r"%Y-%m-%dT%H:%M:%SZ"
+
+
+def now_str() -> str:
+    return datetime.now(timezone.utc).strftime(DATETIME_FORMAT)
+
+
+class IdFactory:
+    """Deterministic CID-like ids so fixtures are reproducible"""
+
+    def __init__(self, seed: int = 0):
+        self.random = random.Random(seed)
+        self.counter = itertools.count()
+
+    def __call__(self, prefix: str = "bafyrei") -> str:
+        body = "".join(self.random.choices(string.ascii_lowercase + "234567", k=40))
+        return f"{prefix}{body}{next(self.counter)}"
+
+
+class FakeSpace:
+    """Schema and objects of one space"""
+
+    def __init__(self, space_id: str, name: str):
+        self.id = space_id
+        self.name = name
+        self.types: dict[str, dict] = {}
+        self.templates: dict[str, list[dict]] = {}
+        self.props: dict[str, dict] = {}
+        self.tags: dict[str, dict[str, dict]] = {}
+        self.objects: dict[str, dict] = {}
+        self.lists: dict[str, dict] = {}
+
+
+class FakeStore:
+    """
+    Holds every fake space and renders objects the way the Anytype API does.
+    Views are predicates over the stored objects so writes move objects between them
+    """
+
+    def __init__(self, seed: int = 0):
+        self.ids = IdFactory(seed)
+        self.spaces: dict[str, FakeSpace] = {}
+        self.lock = threading.RLock()
+
+    # Schema building
+
+    def add_space(self, name: str, space_id: str | None = None) -> FakeSpace:
+        space = FakeSpace(space_id or self.ids() + ".fake", name)
+        self.spaces[space.id] = space
+        return space
+
+    def add_type(
+        self,
+        space: FakeSpace,
+        name: str,
+        key: str,
+        props: list[str] = (),
+        layout: str = "action",
+        templates: list[str] = (),
+    ) -> dict:
+        type_obj = {
+            "object": "type",
+            "id": self.ids(),
+            "key": key,
+            "name": name,
+            "plural_name": name + "s",
+            "layout": layout,
+            "icon": {"format": "emoji", "emoji": "📄"},
+            "archived": False,
+            "properties": [self.render_prop(space.props[p]) for p in props],
+        }
+        space.types[type_obj["id"]] = type_obj
+        space.templates[type_obj["id"]] = [
+            {
+                "object": "object",
+                "id": self.ids(),
+                "name": template,
+                "type": self.type_ref(type_obj),
+            }
+            for template in templates
+        ]
+        return type_obj
+
+    def add_prop(
+        self, space: FakeSpace, name: str, key: str, fmt: str, options=()
+    ) -> dict:
+        prop = {"object": "property", "id": self.ids(), "key": key, "name": name}
+        prop["format"] = fmt
+        space.props[key] = prop
+        space.tags[prop["id"]] = {}
+        for option in options:
+            self.add_tag(space, prop["id"], option)
+        return prop
+
+    def add_tag(self, space: FakeSpace, prop_id: str, name: str, color="grey"):
+        tag = {
+            "object": "tag",
+            "id": self.ids(),
+            "key": name.lower().replace(" ", "_"),
+            "name": name,
+            "color": color,
+        }
+        space.tags[prop_id][tag["id"]] = tag
+        return tag
+
+    def add_list(self, space: FakeSpace, name: str, views: dict) -> dict:
+        """Adds a query object, views maps view name to a predicate over objects"""
+        query_type = self.type_by_key(space, "query")
+        list_obj = self.add_object(space, query_type["key"], name)
+        space.lists[list_obj["id"]] = {
+            "views": [
+                {
+                    "id": self.ids("view"),
+                    "name": view_name,
+                    "layout": "grid",
+                    "filters": [],
+                    "sorts": [],
+                    "predicate": predicate,
+                }
+                for view_name, predicate in views.items()
+            ]
+        }
+        return list_obj
+
+    def add_object(
+        self, space: FakeSpace, type_key: str, name: str, values: dict | None = None
+    ) -> dict:
+        stamp = now_str()
+        obj = {
+            "id": self.ids(),
+            "name": name,
+            "type_key": type_key,
+            "values": dict(values or {}),
+            "created": stamp,
+            "modified": stamp,
+            "archived": False,
+            "markdown": "",
+        }
+        space.objects[obj["id"]] = obj
+        return obj
+
+    # Lookups
+
+    def space(self, space_id: str) -> FakeSpace | None:
+        return self.spaces.get(space_id)
+
+    def type_by_key(self, space: FakeSpace, key: str) -> dict | None:
+        for type_obj in space.types.values():
+            if type_obj["key"] == key:
+                return type_obj
+        return None
+
+    def tag_by_name(self, space: FakeSpace, prop_key: str, name: str) -> dict | None:
+        prop = space.props[prop_key]
+        for tag in space.tags[prop["id"]].values():
+            if tag["name"] == name:
+                return tag
+        return None
+
+    def value(self, space: FakeSpace, obj: dict, prop_key: str):
+        """Readable value of a property, tag names for selects"""
+        raw = obj["values"].get(prop_key)
+        prop = space.props.get(prop_key)
+        if raw is None or prop is None:
+            return raw
+        if prop["format"] == "select":
+            tag = space.tags[prop["id"]].get(raw)
+            return tag["name"] if tag else None
+        if prop["format"] == "multiselect":
+            return [
+                space.tags[prop["id"]][tag_id]["name"]
+                for tag_id in raw
+                if tag_id in space.tags[prop["id"]]
+            ]
+        return raw
+
+    def view_objects(self, space: FakeSpace, list_id: str, view_id: str):
+        list_data = space.lists.get(list_id)
+        if list_data is None:
+            return None
+        for view in list_data["views"]:
+            if view["id"] == view_id:
+                predicate = view["predicate"]
+                return [
+                    obj
+                    for obj in space.objects.values()
+                    if not obj["archived"] and predicate(self, space, obj)
+                ]
+        return None
+
+    # Rendering
+
+    def type_ref(self, type_obj: dict) -> dict:
+        return {
+            "object": "type",
+            "id": type_obj["id"],
+            "key": type_obj["key"],
+            "name": type_obj["name"],
+            "layout": type_obj["layout"],
+        }
+
+    def render_prop(self, prop: dict) -> dict:
+        return {
+            "object": "property",
+            "id": prop["id"],
+            "key": prop["key"],
+            "name": prop["name"],
+            "format": prop["format"],
+        }
+
+    def render_view(self, view: dict) -> dict:
+        return {key: value for key, value in view.items() if key != "predicate"}
+
+    def render_object(self, space: FakeSpace, obj: dict, full: bool = False) -> dict:
+        type_obj = self.type_by_key(space, obj["type_key"])
+        properties = []
+        for key, raw in obj["values"].items():
+            prop = space.props.get(key)
+            if prop is None:
+                continue
+            entry = self.render_prop(prop)
+            fmt = prop["format"]
+            if fmt == "select":
+                entry[fmt] = space.tags[prop["id"]].get(raw)
+            elif fmt == "multiselect":
+                entry[fmt] = [
+                    space.tags[prop["id"]][tag_id]
+                    for tag_id in raw or []
+                    if tag_id in space.tags[prop["id"]]
+                ]
+            elif fmt == "objects":
+                entry[fmt] = list(raw or [])
+            else:
+                entry[fmt] = raw
+            properties.append(entry)
+        for key, name, stamp in (
+            ("created_date", "Creation date", obj["created"]),
+            ("last_modified_date", "Last modified date", obj["modified"]),
+        ):
+            properties.append(
+                {
+                    "object": "property",
+                    "id": key,
+                    "key": key,
+                    "name": name,
+                    "format": "date",
+                    "date": stamp,
+                }
+            )
+        rendered = {
+            "object": "object",
+            "id": obj["id"],
+            "name": obj["name"],
+            "space_id": space.id,
+            "archived": obj["archived"],
+            "layout": type_obj["layout"] if type_obj else "basic",
+            "type": self.type_ref(type_obj) if type_obj else None,
+            "snippet": obj["markdown"][:100],
+            "properties": properties,
+        }
+        if full:
+            rendered["markdown"] = obj["markdown"]
+        return rendered
+
+    # Writes
+
+    def apply_properties(self, space: FakeSpace, obj: dict, properties: list[dict]):
+        """Applies API style property patches, values keyed by format"""
+        for patch in properties or []:
+            prop = space.props.get(patch.get("key"))
+            if prop is None:
+                continue
+            fmt = prop["format"]
+            if fmt == "multiselect" and "multi_select" in patch:
+                value = patch["multi_select"]
+            else:
+                value = patch.get(fmt)
+            if fmt == "select" and value is not None:
+                value = self._tag_id(space, prop, value)
+            elif fmt == "multiselect" and value is not None:
+                value = [self._tag_id(space, prop, tag) for tag in value]
+            obj["values"][prop["key"]] = value
+        obj["modified"] = now_str()
+
+    def _tag_id(self, space: FakeSpace, prop: dict, value: str) -> str:
+        """Selects are written by tag id or tag key"""
+        tags = space.tags[prop["id"]]
+        if value in tags:
+            return value
+        for tag in tags.values():
+            if tag["key"] == value:
+                return tag["id"]
+        return value
@@ -0,0 +1,404 @@
+"""
+Benchmarks the scheduled jobs against the local Anytype stand-in
+
+    PYTHONPATH=src python -m benchmarks.run --sizes 100 1000 10000
+    PYTHONPATH=src python -m benchmarks.run --baseline old.json --threshold 0.15
+
+The stand-in runs in its own process so wall time and peak memory
+only cover the app side. Exits 1 when a metric regresses past the threshold
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+import json
+import logging
+import multiprocessing
+import os
+from pathlib import Path
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from urllib.request import Request, urlopen
+
+os.environ.setdefault("ANYTYPE_KEY", "benchmark")
+
+# pylint: disable=wrong-import-position
+from benchmarks.fake_anytype import FakeAnytype, FaultProfile, Faults, build_workspace
+from models.data import ReferenceData
+from services.anytype.journal_service import JournalService
+from services.anytype.space_service import SpaceService
+from services.anytype.task_service import TaskService
+from services.timetagger_service import TimetaggerService
+from settings import ConfigSettings, Settings
+from utils import api_tools, codec
+from utils.anytype import AsyncAnyTypeUtils
+from utils.cache import object_cache, schema_cache
+from utils.transport import close_async_clients, configure_sessions
+
+RESULTS_DIR = Path(__file__).parent / "results"
+METRICS = ("wall_seconds", "upstream_calls", "peak_memory_bytes")
+
+# Wall time changes smaller than this are noise, not regressions
+NOISE_FLOOR = 0.05
+
+TOGGLES = 20
+
+# Upstreams keep the shipped defaults so results match what users see
+BENCH_CONFIG = {
+    "local": True,
+    "api_addr": "http://benchmark.local",
+    "task_reset": True,
+    "habit_logs": True,
+    "task_logs": True,
+    "task_review_threshold": 3,
+    "log_props": ["AoC", "Project"],
+    "timetagger": True,
+    "upstreams": {target: {"warm_up": False} for target in ("anytype", "timetagger")},
+}
+
+
+class Context:
+    """What a scenario gets, fresh settings per run"""
+
+    def __init__(self, reference: dict, fake_url: str, overrides: dict):
+        config = _merge(
+            dict(BENCH_CONFIG),
+            {
+                "task_space_id": reference["tasks"]["id"],
+                "journal_space_id": reference["journal"]["id"],
+                "timetagger_url": fake_url,
+            },
+        )
+        config = _merge(config, overrides)
+        self.settings = Settings(
+            config=ConfigSettings(**config),
+            data=ReferenceData(anytype=reference),
+        )
+        self.reference = reference
+        self.object_ids: list[str] = []
+
+
+async def _prepare_toggle(ctx: Context):
+    tasks = await AsyncAnyTypeUtils().search(
+        ctx.reference["tasks"]["id"], "benchmark tasks", {"types": ["task"]}
+    )
+    ctx.object_ids = list(tasks.values())[:TOGGLES]
+
+
+async def recurrent_check(ctx: Context):
+    journal = JournalService(ctx.settings)
+    await TaskService(ctx.settings, journal).recurrent_check()
+
+
+async def daily_rollover(ctx: Context):
+    journal = JournalService(ctx.settings)
+    await TaskService(ctx.settings, journal).daily_rollover()
+
+
+async def scan_space(ctx: Context):
+    await SpaceService(ctx.settings).scan_space("tasks", ctx.reference["tasks"]["id"])
+
+
+async def copy_objects(ctx: Context):
+    await SpaceService(ctx.settings).copy_objects(
+        ctx.reference["tasks"]["id"], ctx.reference["target"]["id"], {}
+    )
+
+
+async def toggle(ctx: Context):
+    service = TimetaggerService(ctx.settings)
+    for object_id in ctx.object_ids:
+        await service.toggle(object_id)
+
+
+# name: (scenario, untimed setup)
+SCENARIOS = {
+    "recurrent_check": (recurrent_check, None),
+    "daily_rollover": (daily_rollover, None),
+    "scan_space": (scan_space, None),
+    "copy_objects": (copy_objects, None),
+    "toggle": (toggle, _prepare_toggle),
+}
+
+
+def _merge(base: dict, extra: dict) -> dict:
+    for key, value in extra.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            base[key] = _merge(dict(base[key]), value)
+        else:
+            base[key] = value
+    return base
+
+
+def _serve(tasks: int, seed: int, profile: dict, conn):
+    """Child process, builds the fixtures and serves them until terminated"""
+    store, reference = build_workspace(tasks, seed, target=True)
+    fake = FakeAnytype(
+        store,
+        Faults({"*": FaultProfile(**profile)}, seed),
+        factory=lambda: build_workspace(tasks, seed, target=True)[0],
+    )
+    conn.send((fake.port, reference))
+    fake.serve_forever()
+
+
+def _control(base_url: str, method: str, path: str) -> dict:
+    with urlopen(Request(base_url + path, method=method), timeout=120) as response:
+        return json.loads(response.read())
+
+
+class Server:
+    """Stand-in running in a child process"""
+
+    def __init__(self, tasks: int, seed: int, profile: dict):
+        context = multiprocessing.get_context("spawn")
+        parent, child = context.Pipe()
+        self.process = context.Process(
+            target=_serve, args=(tasks, seed, profile, child), daemon=True
+        )
+        self.process.start()
+        port, self.reference = parent.recv()
+        self.url = f"http://127.0.0.1:{port}"
+
+    def reset(self):
+        _control(self.url, "POST", "/_fake/reset")
+
+    def clear_calls(self):
+        _control(self.url, "DELETE", "/_fake/calls")
+
+    def calls(self) -> dict:
+        return _control(self.url, "GET", "/_fake/calls")["calls"]
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join()
+
+
+def _point_client(url: str):
+    host, port = url.removeprefix("http://").split(":")
+    api_tools.keys.anytype_url = host
+    api_tools.keys.anytype_port = port
+    api_tools.keys.timetagger_key = "benchmark"
+    api_tools.default_headers.cache_clear()
+
+
+async def _run_once(name: str, server: Server, overrides: dict, trace: bool):
+    scenario, setup = SCENARIOS[name]
+    server.reset()
+    ctx = Context(server.reference, server.url, overrides)
+    configure_sessions(ctx.settings.config.upstreams)
+    schema_cache.configure(
+        ctx.settings.config.schema_cache_ttl, ctx.settings.config.schema_cache_size
+    )
+    object_cache.configure(
+        ctx.settings.config.object_cache_ttl, ctx.settings.config.object_cache_size
+    )
+    try:
+        if setup is not None:
+            await setup(ctx)
+        server.clear_calls()
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        await scenario(ctx)
+        wall = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace else None
+    finally:
+        if trace:
+            tracemalloc.stop()
+        await close_async_clients()
+    return wall, peak, server.calls()
+
+
+def run_scenario(name: str, size: int, server: Server, args, overrides: dict):
+    result = {"scenario": name, "size": size, "error": None}
+    try:
+        walls, calls = [], {}
+        for _ in range(args.repeat):
+            wall, _, calls = asyncio.run(_run_once(name, server, overrides, False))
+            walls.append(wall)
+        peak = None
+        if args.memory:
+            _, peak, _ = asyncio.run(_run_once(name, server, overrides, True))
+    except Exception as err:  # pylint: disable=broad-exception-caught
+        result["error"] = f"{type(err).__name__}: {err}"
+        return result
+    result.update(
+        {
+            "wall_seconds": round(statistics.median(walls), 4),
+            "runs": [round(wall, 4) for wall in walls],
+            "upstream_calls": sum(calls.values()),
+            "calls_by_route": dict(sorted(calls.items())),
+            "peak_memory_bytes": peak,
+        }
+    )
+    return result
+
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> list[str]:
+    """Annotates results with their change against a baseline, returns regressions"""
+    previous = {(r["scenario"], r["size"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get((result["scenario"], result["size"]))
+        if before is None or result["error"] or before.get("error"):
+            continue
+        result["change"] = {}
+        for metric in METRICS:
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            result["change"][metric] = round(change, 4)
+            if metric == "wall_seconds" and new - old < NOISE_FLOOR:
+                continue
+            if change > threshold:
+                regressions.append(
+                    f"{result['scenario']} @ {result['size']}: "
+                    f"{metric} {old} -> {new} (+{change:.0%})"
+                )
+    return regressions
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_result(result: dict):
+    label = f"{result['scenario']:<16} {result['size']:>6}"
+    if result["error"]:
+        print(f"{label}  failed: {result['error']}")
+        return
+    memory = result["peak_memory_bytes"]
+    memory = f"{memory / 1e6:8.1f} MB" if memory is not None else "       - MB"
+    change = result.get("change", {}).get("wall_seconds")
+    change = f"  ({change:+.0%})" if change is not None else ""
+    print(
+        f"{label} {result['wall_seconds']:9.3f} s {result['upstream_calls']:7} calls"
+        f" {memory}{change}"
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs, median")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-memory",
+        dest="memory",
+        action="store_false",
+        help="Skip the extra tracemalloc run",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="Per request")
+    parser.add_argument("--error-429", type=float, default=0.0)
+    parser.add_argument("--error-5xx", type=float, default=0.0)
+    parser.add_argument("--drop", type=float, default=0.0)
+    parser.add_argument(
+        "--config", default=None, help="JSON file merged over the benchmark config"
+    )
+    parser.add_argument("--output", default=None, help="Results file")
+    parser.add_argument("--baseline", default=None, help="Results file to compare")
+    parser.add_argument("--threshold", type=float, default=0.1, help="e.g. 0.1 = 10%")
+    parser.add_argument("--verbose", action="store_true", help="Keep app logging")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+    overrides = {}
+    if args.config:
+        overrides = json.loads(Path(args.config).read_text(encoding="utf-8"))
+    profile = {
+        "latency": args.latency,
+        "error_429": args.error_429,
+        "retry_after": 0.1,
+        "error_5xx": args.error_5xx,
+        "drop": args.drop,
+    }
+    output = (
+        Path(args.output)
+        if args.output
+        else RESULTS_DIR
+        / (datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json")
+    )
+    output = output.resolve()
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+
+    # Services sync reference data to data/data.yaml, keep that out of the repo
+    workdir = tempfile.mkdtemp(prefix="anytype-bench-")
+    Path(workdir, "data").mkdir()
+    os.chdir(workdir)
+
+    results = []
+    for size in args.sizes:
+        print(f"Building {size} task fixtures")
+        server = Server(size, args.seed, profile)
+        _point_client(server.url)
+        try:
+            for name in args.scenarios:
+                result = run_scenario(name, size, server, args, overrides)
+                _print_result(result)
+                results.append(result)
+        finally:
+            server.stop()
+
+    regressions = []
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "codec": codec.CODEC,
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "faults": profile,
+            "config": overrides,
+            "baseline": args.baseline,
+            "threshold": args.threshold,
+        },
+        "results": results,
+        "regressions": regressions,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results written to {output}")
+
+    if regressions:
+        print("Regressions past threshold:")
+        for line in regressions:
+            print("  " + line)
+        return 1
+    if any(result["error"] for result in results):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
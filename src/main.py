@@ -7,6 +7,7 @@ from fastapi import FastAPI
 
 from middlewares.exception_middleware import ExceptionMiddleware
 from utils.api_tools import IPAllowlistMiddleware
+from utils.codec import FastJSONResponse
 from utils.docs import DESCRIPTION, TAGS
 from utils.logger import logger
 
@@ -33,6 +34,7 @@ def create_app() -> FastAPI:
         root_path="/aa-api",
         openapi_tags=TAGS,
         lifespan=lifespan,
+        default_response_class=FastJSONResponse,
     )
 
     fastapi_app.add_middleware(ExceptionMiddleware)
@@ -2,6 +2,7 @@
 
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
+import httpx
 import requests
 
 from utils.exception import AnytypeException
@@ -31,7 +32,7 @@ class ExceptionMiddleware(BaseHTTPMiddleware):
             error_type = type(exc).__name__
             detail = str(exc)
 
-            if isinstance(exc, requests.exceptions.HTTPError):
+            if isinstance(exc, (requests.exceptions.HTTPError, httpx.HTTPStatusError)):
                 try:
                     detail = exc.response.json().get("message", detail)
                 except Exception:
@@ -47,7 +48,7 @@ class ExceptionMiddleware(BaseHTTPMiddleware):
             }
 
             try:
-                self.pushover.send_message(
+                await self.pushover.send_message(
                     f"API Error: {error_type}", detail, priority=1
                 )
             except:
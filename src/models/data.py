@@ -6,6 +6,9 @@ from pydantic import BaseModel, ConfigDict, Field
 from utils.helper import Helper
 from utils.logger import logger
 
+# Name of the task space set by task_space_id, journal and timer jobs use this one
+TASK_SPACE = "tasks"
+
 
 class QueryData(BaseModel):
     """Query object reference"""
@@ -51,6 +54,13 @@ class SpaceData(BaseModel):
     props: Dict[str, PropData] = Field(default_factory=dict)
 
 
+class Watermark(BaseModel):
+    """Where an incremental job left off in a space"""
+
+    modified: Optional[str] = None
+    full_sweep: Optional[str] = None
+
+
 class ActiveTimer(BaseModel):
     """Stores Mirrored timer data"""
 
@@ -63,6 +73,7 @@ class ReferenceData(BaseModel):
 
     anytype: Dict[str, SpaceData] = {}
     timetagger: Optional[dict[str, ActiveTimer]] = None
+    watermarks: Dict[str, Watermark] = Field(default_factory=dict)
 
     def file_sync(self):
         """Writes model to local file for reference"""
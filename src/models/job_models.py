@@ -0,0 +1,22 @@
+"""
+Models for the run history of scheduled and manual jobs
+"""
+
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class JobRun(BaseModel):
+    """One run of a job with its timing, upstream calls and object counts"""
+
+    job: str
+    trigger: str
+    started: str
+    ended: Optional[str] = None
+    seconds: Optional[float] = None
+    phases: Dict[str, float] = Field(default_factory=dict)
+    calls: Dict[str, int] = Field(default_factory=dict)
+    objects: Dict[str, int] = Field(default_factory=dict)
+    errors: List[str] = Field(default_factory=list)
+    result: Optional[str] = None
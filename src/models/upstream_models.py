@@ -0,0 +1,143 @@
+"""
+Models for tuning the HTTP transport used to reach each upstream
+"""
+
+import random
+from typing import Annotated, Optional
+
+from pydantic import BaseModel, Field
+
+
+class RetryPolicy(BaseModel):
+    """Bounded retries, per call deadline and circuit breaker thresholds"""
+
+    max_retries: Annotated[
+        int,
+        Field(description="Retries after the first attempt before giving up", ge=0),
+    ] = 4
+
+    backoff_base: Annotated[
+        float,
+        Field(description="Seconds waited before the first retry, doubled each retry"),
+    ] = 1.0
+
+    backoff_max: Annotated[
+        float,
+        Field(description="Upper bound in seconds for a single backoff wait"),
+    ] = 30.0
+
+    jitter: Annotated[
+        float,
+        Field(description="Random seconds added to each backoff wait"),
+    ] = 0.5
+
+    deadline: Annotated[
+        float,
+        Field(description="Seconds a call may spend on all its attempts together"),
+    ] = 60.0
+
+    breaker_threshold: Annotated[
+        int,
+        Field(
+            description="Consecutive failures before the circuit opens and calls fail fast",
+            ge=1,
+        ),
+    ] = 5
+
+    breaker_reset: Annotated[
+        float,
+        Field(
+            description="Seconds the circuit stays open before a probe is let through"
+        ),
+    ] = 30.0
+
+    def backoff(self, attempt: int) -> float:
+        """Wait before the given retry, exponential with a cap"""
+        wait = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return wait + random.uniform(0, self.jitter)
+
+
+class RateLimit(BaseModel):
+    """
+    Client side token bucket, unlimited until a 429 arrives,
+    then halved on each 429 and raised step by step on success
+    """
+
+    rate: Annotated[
+        Optional[float],
+        Field(
+            description="Starting requests per second, unlimited until a 429 if unset",
+            gt=0,
+        ),
+    ] = None
+
+    max_rate: Annotated[
+        Optional[float],
+        Field(
+            description=(
+                "Ceiling the rate recovers to after 429s, "
+                "back to the starting rate or unlimited if unset"
+            ),
+            gt=0,
+        ),
+    ] = None
+
+    burst: Annotated[
+        int,
+        Field(description="Requests that may be sent back to back", ge=1),
+    ] = 20
+
+    min_rate: Annotated[
+        float,
+        Field(description="Floor the rate may be lowered to after 429s", gt=0),
+    ] = 0.5
+
+    decrease_factor: Annotated[
+        float,
+        Field(description="Rate multiplier applied on each 429", gt=0, lt=1),
+    ] = 0.5
+
+    recovery_step: Annotated[
+        float,
+        Field(description="Requests per second regained after each success", ge=0),
+    ] = 1.0
+
+
+class UpstreamConfig(BaseModel):
+    """Connection settings for a single upstream target"""
+
+    pool_size: Annotated[
+        int,
+        Field(
+            description="Maximum number of keep-alive connections kept open to the target",
+            ge=1,
+        ),
+    ] = 10
+
+    pool_block: Annotated[
+        bool,
+        Field(
+            description="Wait for a free pooled connection instead of opening an extra one",
+        ),
+    ] = False
+
+    warm_up: Annotated[
+        bool,
+        Field(
+            description="Open a connection to the target when the app starts",
+        ),
+    ] = True
+
+    fan_out: Annotated[
+        int,
+        Field(
+            description=(
+                "Requests a batch such as a view's object details sends at once, "
+                "keep at or below pool_size"
+            ),
+            ge=1,
+        ),
+    ] = 8
+
+    retry: RetryPolicy = Field(default_factory=RetryPolicy)
+    rate_limit: RateLimit = Field(default_factory=RateLimit)
@@ -4,11 +4,14 @@ from functools import lru_cache
 
 from fastapi import APIRouter
 
+from utils.cache import schema_cache
+from utils.codec import FastJSONResponse
+from utils.jobs import job_locks
 from utils.logger import logger
 
 from services.anytype.journal_service import JournalService
 from services.anytype.space_service import SpaceService
-from services.anytype.task_service import TaskService
+from services.anytype.task_service import TaskSpaces
 
 from models.anytype_models import SpaceEditRequest
 
@@ -24,7 +27,7 @@ def get_space_service():
 
 @lru_cache
 def get_task_service():
-    return TaskService(
+    return TaskSpaces(
         settings, get_journal_service() if settings.config.journal_space_id else None
     )
 
@@ -45,50 +48,65 @@ anytype_journal = get_journal_service()
 async def recurrent_check():
     """Endpoint for task maintenance"""
     logger.info("Recurrent check endpoint called")
-    return anytype_tasks.recurrent_check()
+    return await job_locks.run("recurrent_check", anytype_tasks.recurrent_check)
 
 
 @router.get("/scan_space/{space_name}/id/{space_id}", tags=["spaces", "general"])
 async def scan_space(space_name, space_id):
     """Endpoint to populate Data with space data"""
     logger.info("Space scanner endpoint called")
-    return anytype_spaces.scan_space(space_name, space_id)
+    return await job_locks.run(
+        f"scan_space {space_name}", anytype_spaces.scan_space, space_name, space_id
+    )
 
 
 @router.get("/reload_space/{space_name}", tags=["spaces", "general"])
 async def reload_space(space_name):
-    """Endpoint to reload space data at target"""
+    """Endpoint to reload space data at target, bypassing cached schema"""
     logger.info("Space reloader endpoint called")
-    anytype_spaces.scan_space(space_name, settings.data.anytype[space_name].id)
-    return settings.data.anytype[space_name]
+    space_id = settings.data.anytype[space_name].id
+    schema_cache.invalidate(space_id)
+    await job_locks.run(
+        f"scan_space {space_name}", anytype_spaces.scan_space, space_name, space_id
+    )
+    return FastJSONResponse(settings.data.anytype[space_name])
+
+
+@router.get("/rescan_space/{space_name}", tags=["spaces", "general"])
+async def rescan_space(space_name):
+    """Endpoint to refresh space data from listings, returns what changed"""
+    logger.info("Space rescan endpoint called")
+    return await job_locks.run(
+        f"rescan_space {space_name}", anytype_spaces.rescan_space, space_name
+    )
 
 
 @router.get("/space_data/{space_name}", tags=["spaces", "general"])
 async def space_data(space_name):
     """Endpoint to inspect space data"""
     logger.info("Space data endpoint called")
-    return settings.data.anytype[space_name]
+    return FastJSONResponse(settings.data.anytype[space_name])
 
 
 @router.post("/migrate", tags=["spaces"])
 async def migrate(edit_request: SpaceEditRequest):
     """Endpoint for copying types and their from one space to another"""
     logger.info("Migration Endpoint called")
-    return anytype_spaces.migrate_spaces(edit_request)
+    return await job_locks.run("migrate", anytype_spaces.migrate_spaces, edit_request)
 
 
 @router.post("/sync_spaces", tags=["spaces"])
 async def scan_spaces(sync_request: SpaceEditRequest):
     """Endpoint for scanning spaces for altering configuration file"""
     logger.info("Space syncer endpoint called")
-    return anytype_spaces.sync_spaces(sync_request)
+    return await anytype_spaces.sync_spaces(sync_request)
 
 
 @router.get("/daily_rollover", tags=["scheduled"])
 async def task_status_reset():
     """Endpoint to update overdue or no collection tasks"""
     logger.info("Daily rollover endpoint called")
-    return anytype_tasks.daily_rollover()
+    return await job_locks.run("daily_rollover", anytype_tasks.daily_rollover)
 
 
 if settings.config.journal_space_id:
@@ -97,10 +115,12 @@ if settings.config.journal_space_id:
     async def day_journal():
         """Endpoint to fetch or create day journal instance id"""
         logger.info("Day Journal endpoint called")
-        return anytype_journal.find_or_create_day_journal()
+        return await job_locks.run(
+            "day_journal", anytype_journal.find_or_create_day_journal
+        )
 
     @router.get("/log_habit/{object_id}", tags=["journal"])
     async def log_habit(object_id):
         """Endpoint to Log Habit occurrences"""
         logger.info("Log Habit endpoint called")
-        return anytype_journal.log_habit(object_id)
+        return await anytype_journal.log_habit(object_id)
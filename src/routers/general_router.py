@@ -1,8 +1,13 @@
 from http import HTTPStatus
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
 
+from utils.codec import FastJSONResponse
+from utils.jobs import job_history
 from utils.logger import logger
+from utils.metrics import metrics
+from utils.resilience import breaker_states
 
 from settings import generate_settings
 from schedule import scheduler
@@ -16,11 +21,24 @@ async def get_health_endpoint():
     return {"status": "ok"}
 
 
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Metrics Endpoint, upstream call metrics in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/breakers")
+async def get_breakers():
+    """Breakers Endpoint, circuit state of each upstream that has been called"""
+    logger.info("Breakers endpoint called")
+    return breaker_states()
+
+
 @router.get("/data")
 async def get_ref_data():
     """Data Endpoint, should always return settings data"""
     logger.info("Data endpoint called")
-    return generate_settings()
+    return FastJSONResponse(generate_settings())
 
 
 @router.get("/jobs", tags=["scheduled"])
@@ -41,3 +59,12 @@ async def get_jobs():
         }
 
     return job_data
+
+
+@router.get("/jobs/history", tags=["scheduled"])
+async def get_job_history(
+    job: str | None = None, limit: int | None = Query(default=None, ge=1)
+):
+    """Job History Endpoint, recent runs newest first with timings and call counts"""
+    logger.info("Job history endpoint called")
+    return FastJSONResponse(job_history.list(job, limit))
@@ -25,4 +25,4 @@ timetagger = get_timetagger_service()
 async def toggle_time(object_id: str):
     """End point for starting a timer"""
     logger.info("Timer toggle Endpoint called")
-    return timetagger.toggle(object_id)
+    return await timetagger.toggle(object_id)
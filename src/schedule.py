@@ -1,25 +1,69 @@
 """Scheduler for Anytype Automation"""
 
+from contextlib import asynccontextmanager
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from fastapi import FastAPI
 
 from services.anytype.journal_service import JournalService
-from services.anytype.task_service import TaskService
+from services.anytype.space_service import SpaceService
+from services.anytype.task_service import TaskSpaces
 
+from utils.api_tools import PUSHOVER_URL, anytype_base_url, warm_up_clients
+from utils.cache import object_cache, schema_cache
+from utils.jobs import job_history, job_locks
 from utils.logger import logger
+from utils import transport
 
 from settings import generate_settings
 
-scheduler = AsyncIOScheduler()
+scheduler = AsyncIOScheduler(job_defaults={"max_instances": 1, "coalesce": True})
 settings = generate_settings()
 
 
-def lifespan(_app: FastAPI) -> None:
+def add_job(name: str, job, trigger: str, job_id: str | None = None, **trigger_args):
+    """
+    Schedules a job under its run lock, runs that are late past the misfire
+    grace are dropped and a backlog of missed runs coalesces into one
+    """
+    scheduler.add_job(
+        job_locks.guard(name, job),
+        trigger,
+        id=job_id or name,
+        name=name,
+        misfire_grace_time=settings.config.job_misfire_grace_seconds,
+        replace_existing=True,
+        **trigger_args,
+    )
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
     """Job Scheduler"""
+    transport.configure_sessions(settings.config.upstreams)
+    schema_cache.configure(
+        settings.config.schema_cache_ttl, settings.config.schema_cache_size
+    )
+    object_cache.configure(
+        settings.config.object_cache_ttl, settings.config.object_cache_size
+    )
+    job_history.configure(
+        settings.config.job_history_size, settings.config.job_history_file
+    )
+    upstream_urls = {"anytype": anytype_base_url()}
+    if settings.config.timetagger:
+        upstream_urls["timetagger"] = settings.config.timetagger_url
+    if settings.config.pushover:
+        upstream_urls["pushover"] = PUSHOVER_URL
+    await warm_up_clients(upstream_urls)
+
+    space_service = SpaceService(settings)
+    await space_service.load_spaces()
+
     journal_service = (
         JournalService(settings) if settings.config.journal_space_id != "" else None
     )
-    task_service = TaskService(settings, journal_service)
+    task_service = TaskSpaces(settings, journal_service)
 
     logger.info("Adding jobs")
     if settings.config.local:
@@ -28,12 +72,25 @@ def lifespan(_app: FastAPI) -> None:
 
         # Anytype
         logger.info("Adding daily rollover")
-        scheduler.add_job(task_service.daily_rollover, "cron", hour=1)
+        add_job("daily_rollover", task_service.daily_rollover, "cron", hour=1)
 
         if settings.config.task_reset:
             logger.info("Adding task reset")
-            scheduler.add_job(
-                task_service.recurrent_check, "cron", hour="2-23", minute="*/30"
+            add_job(
+                "recurrent_check",
+                task_service.recurrent_check,
+                "cron",
+                hour="2-23",
+                minute="*/30",
+            )
+
+        if settings.config.space_rescan_minutes > 0:
+            logger.info("Adding space rescan")
+            add_job(
+                "rescan_spaces",
+                space_service.rescan_spaces,
+                "interval",
+                minutes=settings.config.space_rescan_minutes,
             )
 
         # Pushover
@@ -42,10 +99,15 @@ def lifespan(_app: FastAPI) -> None:
             for hour in settings.config.pushover_journal_hours:
                 logger.info("Adding journal reminders")
 
-                scheduler.add_job(
-                    journal_service.find_or_create_day_journal, "cron", hour=hour
+                add_job(
+                    "day_journal",
+                    journal_service.find_or_create_day_journal,
+                    "cron",
+                    job_id=f"day_journal_{hour}",
+                    hour=hour,
                 )
     scheduler.start()
     yield
     if not settings.config.local:
         scheduler.shutdown()
+    await transport.close_async_clients()
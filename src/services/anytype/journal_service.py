@@ -1,7 +1,7 @@
 import json
 
 
-from utils.anytype import AnyTypeUtils
+from utils.anytype import AsyncAnyTypeUtils
 from utils.helper import Helper
 from utils.date_tools import get_today
 from utils.logger import logger
@@ -14,17 +14,17 @@ class JournalService:
         self.data = self.settings.data.anytype
         self.space_id = self.settings.config.journal_space_id
         self.task_space = self.settings.config.task_space_id
-        self.anytype = AnyTypeUtils()
+        self.anytype = AsyncAnyTypeUtils()
         self.helper = Helper()
         if settings.config.pushover:
             self.pushover = PushoverUtils()
 
-    def find_or_create_day_journal(self):
+    async def find_or_create_day_journal(self):
         """Searches for or creates a journal for the day"""
         dt_now = get_today()
         date_str = dt_now.strftime(r"%d.%m.%y")
 
-        entry = self.anytype.search(
+        entry = await self.anytype.search(
             self.space_id,
             "looking for journal object",
             {"query": date_str},
@@ -39,11 +39,8 @@ class JournalService:
             }
 
             # Matching output of search
-            entry = {
-                date_str: self.anytype.create_object(self.space_id, data)["object"][
-                    "id"
-                ]
-            }
+            new_entry = await self.anytype.create_object(self.space_id, data)
+            entry = {date_str: new_entry["object"]["id"]}
 
         message = ""
 
@@ -62,9 +59,9 @@ class JournalService:
             self.space_id, entry[date_str]
         )}>this</a>!"""
 
-        self.pushover.send_message("Check in", message + link)
+        await self.pushover.send_message("Check in", message + link)
 
-    def log_object(self, obj_dict):
+    async def log_object(self, obj_dict):
         """
         Define log object for archival
         """
@@ -92,30 +89,32 @@ class JournalService:
                 metadata_dict[prop] = obj_dict[prop]
             except KeyError:
                 logger.warning("prop not discovered, might not matter")
-        sorted_data = {k: metadata_dict[k] for k in sorting}
+        sorted_data = {k: metadata_dict.get(k) for k in sorting}
         data["properties"].append({"key": "metadata", "text": json.dumps(sorted_data)})
-        self.anytype.create_object(self.space_id, data)
+        await self.anytype.create_object(self.space_id, data)
 
-    def log_habit(self, object_id):
-        obj_dict = self.anytype.get_object_by_id(self.task_space, object_id)
+    async def log_habit(self, object_id):
+        # Under the lock the cached copy is current, each PATCH recaches its reply
+        async with self.anytype.locked(self.task_space, object_id):
+            obj_dict = await self.anytype.get_object_by_id(self.task_space, object_id)
 
-        self.log_object(obj_dict)
+            await self.log_object(obj_dict)
 
-        new_count = obj_dict["Count"] + 1
-        self.anytype.update_object(
-            self.task_space,
-            obj_dict["name"],
-            object_id,
-            {"properties": [{"key": "count", "number": new_count}]},
-        )
+            new_count = obj_dict["Count"] + 1
+            await self.anytype.update_object(
+                self.task_space,
+                obj_dict["name"],
+                object_id,
+                {"properties": [{"key": "count", "number": new_count}]},
+            )
 
         return {
             "Habit logged": obj_dict["name"],
             "Habit count": "✨" + str(new_count) + "✨",
         }
 
-    def review_overflow(self, task, space_id):
-        self.anytype.create_object(
+    async def review_overflow(self, task, space_id):
+        await self.anytype.create_object(
             self.data["journal"].id,
             {
                 "template_id": self.data["journal"]
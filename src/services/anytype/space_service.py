@@ -1,12 +1,17 @@
 """Service for managing Anytype Spaces"""
 
-from requests.exceptions import HTTPError
+import asyncio
 
-from models.data import SpaceData
+from httpx import HTTPStatusError
+
+from models.data import PropData, QueryData, SpaceData, TypeData
 from models.anytype_models import SpaceEditRequest
 
-from utils.anytype import AnyTypeUtils
+from utils.anytype import AsyncAnyTypeUtils
+from utils.cache import schema_cache
+from utils.exception import AnytypeException
 from utils.helper import Helper
+from utils.jobs import job_locks
 from utils.logger import logger
 
 
@@ -55,17 +60,25 @@ class SpaceService:
     def __init__(self, settings):
         self.settings = settings
         self.data = settings.data.anytype
-        self.anytype = AnyTypeUtils()
+        self.anytype = AsyncAnyTypeUtils()
         self.helper = Helper()
-        if self.data == {}:
-            self.scan_space("tasks", settings.config.task_space_id)
+
+    async def load_spaces(self):
+        """Scans configured spaces missing from reference data, run at startup"""
+        await asyncio.gather(
+            *(
+                self.scan_space(space_name, space_id)
+                for space_name, space_id in self.settings.config.task_spaces.items()
+                if space_name not in self.data
+            )
+        )
         if (
             self.settings.config.journal_space_id != ""
             and self.data.get("journal") is None
         ):
-            self.scan_space("journal", settings.config.journal_space_id)
+            await self.scan_space("journal", self.settings.config.journal_space_id)
 
-    def scan_space(self, space_name, space_id):
+    async def scan_space(self, space_name, space_id):
         """
         Scans a space and collect:
         - custom (+ Query,) types and their templates
@@ -74,61 +87,187 @@ class SpaceService:
 
         anytype_ref = {"id": space_id}
         data_types = [t for t in DEFAULT_TYPES if t != "Query"]
-        anytype_ref["types"] = self.anytype.get_types(space_id, system_types=data_types)
-        anytype_ref["queries"] = self.anytype.get_lists(
-            space_id, anytype_ref["types"]["Query"]["id"]
+        # Props don't depend on types, their tags are fetched alongside the templates
+        props = asyncio.create_task(
+            self.anytype.get_property_list(space_id, system_props=DEFAULT_PROPS)
         )
+        try:
+            anytype_ref["types"] = await self.anytype.get_types(
+                space_id, system_types=data_types
+            )
+            anytype_ref["queries"] = await self.anytype.get_lists(
+                space_id, anytype_ref["types"]["Query"]["id"]
+            )
+        except BaseException:
+            props.cancel()
+            raise
 
-        anytype_ref["props"] = self.anytype.get_property_list(
-            space_id, system_props=DEFAULT_PROPS
-        )
+        anytype_ref["props"] = await props
         self.settings.data.anytype[space_name] = SpaceData(**anytype_ref)
 
         self.settings.data.file_sync()
 
         return self.settings.data
 
-    def migrate_spaces(self, request: SpaceEditRequest):
+    async def rescan_space(self, space_name):
+        """
+        Refreshes a scanned space from its listings, patching the reference data
+        in place. Templates and tags are only fetched for types and props that
+        are new or changed in the listings, so a template or tag added to an
+        unchanged type or prop waits for a full scan (/reload_space).
+        A configured space that was never scanned gets a full scan.
+        Returns what was added, removed and changed
+        """
+        if space_name not in self.data:
+            return await self._first_scan(space_name)
+        cached = self.data[space_name]
+        space_id = cached.id
+        schema_cache.invalidate(space_id, "types", "props")
+
+        data_types = [t for t in DEFAULT_TYPES if t != "Query"]
+        listed_types, listed_props = await asyncio.gather(
+            self.anytype.get_types(space_id, system_types=data_types, templates=False),
+            self.anytype.get_property_list(
+                space_id, system_props=DEFAULT_PROPS, options=False
+            ),
+        )
+        stale_types = {
+            name: type_dict
+            for name, type_dict in listed_types.items()
+            if name not in cached.types
+            or cached.types[name].model_dump(exclude={"templates"}) != type_dict
+        }
+        stale_props = {
+            name: prop
+            for name, prop in listed_props.items()
+            if name not in cached.props
+            or cached.props[name].model_dump(exclude={"options"}) != prop
+        }
+        schema_cache.invalidate(space_id, "templates", "tags")
+        await asyncio.gather(
+            self.anytype.add_templates(space_id, list(stale_types.values())),
+            self.anytype.add_options(space_id, list(stale_props.values())),
+        )
+        types = {
+            name: TypeData(**type_dict) if name in stale_types else cached.types[name]
+            for name, type_dict in listed_types.items()
+        }
+
+        queries = {}
+        if "Query" in types:
+            listed_queries = await self.anytype.get_lists(space_id, types["Query"].id)
+            queries = {
+                name: QueryData(**query) for name, query in listed_queries.items()
+            }
+        props = {
+            name: PropData(**prop) if name in stale_props else cached.props[name]
+            for name, prop in listed_props.items()
+        }
+
+        changes = {
+            "types": self._patch(cached.types, types),
+            "queries": self._patch(cached.queries, queries),
+            "props": self._patch(cached.props, props),
+        }
+        if any(any(section.values()) for section in changes.values()):
+            logger.info(f"Space {space_name} changed, syncing reference data")
+            self.settings.data.file_sync()
+        return changes
+
+    async def _first_scan(self, space_name):
+        """Full scan of a configured space missing from reference data"""
+        space_id = self.settings.config.task_spaces.get(space_name)
+        if space_name == "journal" and self.settings.config.journal_space_id != "":
+            space_id = self.settings.config.journal_space_id
+        if not space_id:
+            raise AnytypeException(404, f"Space {space_name} is not configured")
+
+        await self.scan_space(space_name, space_id)
+        scanned = self.data[space_name]
+        return {
+            section: {
+                "added": list(getattr(scanned, section)),
+                "removed": [],
+                "changed": [],
+            }
+            for section in ("types", "queries", "props")
+        }
+
+    async def rescan_spaces(self):
+        """
+        Incremental rescan of every scanned space, run on a schedule.
+        Spaces take the lock of the rescan endpoint, one it is already
+        rescanning is skipped
+        """
+        results = {}
+        for space_name in list(self.data):
+            lock = job_locks.lock(f"rescan_space {space_name}")
+            if lock.locked():
+                logger.warning(f"rescan_space {space_name} is running, skipping")
+                results[space_name] = "skipped: already running"
+                continue
+            async with lock:
+                results[space_name] = await self.rescan_space(space_name)
+        return results
+
+    def _patch(self, cached: dict, live: dict):
+        """Syncs a cached section with the live one, returns the names that changed"""
+        changes = {"added": [], "removed": [], "changed": []}
+        for name in list(cached):
+            if name not in live:
+                del cached[name]
+                changes["removed"].append(name)
+        for name, value in live.items():
+            if name not in cached:
+                changes["added"].append(name)
+            elif cached[name] != value:
+                changes["changed"].append(name)
+            else:
+                continue
+            cached[name] = value
+        return changes
+
+    async def migrate_spaces(self, request: SpaceEditRequest):
         """Copy types and copy objects of that type to new space"""
 
         return_data = {}
         target_space = request.target_space_name
 
         if "clear" in request.stages:
-            return_data["cleared"] = self.clear_space(
+            return_data["cleared"] = await self.clear_space(
                 request.target_space_id, request.delete_task_types
             )
 
-        return_data = self.sync_spaces(request, return_data)
+        return_data = await self.sync_spaces(request, return_data)
 
         if "objects" in request.stages:
-            return_data["objects"] = self.copy_objects(
+            return_data["objects"] = await self.copy_objects(
                 request.source_space_id, request.target_space_id, return_data
             )
 
         return return_data
 
-    def clear_space(self, target_id, delete_task_types):
+    async def clear_space(self, target_id, delete_task_types):
         """Removes basic types and props, Status and Due Date prop must be removed manually"""
-        types_to_clear = self.anytype.get_types(
+        types_to_clear = await self.anytype.get_types(
             target_id,
             (DEFAULT_TYPES + STARTER_TYPES if delete_task_types else DEFAULT_TYPES),
         )
         for type_obj in types_to_clear.values():
-            self.anytype.delete_type(target_id, type_obj)
-        props_to_clear = self.anytype.get_property_list(
+            await self.anytype.delete_type(target_id, type_obj)
+        props_to_clear = await self.anytype.get_property_list(
             target_id,
             (DEFAULT_PROPS + ["Status", "Due date"]),
         )
         for prop in props_to_clear.values():
             if prop["name"] not in DEFAULT_PROPS:
-                self.anytype.delete_property(target_id, prop)
+                await self.anytype.delete_property(target_id, prop)
 
         if not types_to_clear and not props_to_clear:
             return "Nothing to clear"
         return "Cleared everything but starter types (safetynet)"
 
-    def sync_spaces(
+    async def sync_spaces(
         self, request: SpaceEditRequest, return_data: dict, reload_data: bool = False
     ):
         """Syncs spaces and update self file"""
@@ -137,22 +276,24 @@ class SpaceService:
         target_space_id = request.target_space_id
 
         if "props" in request.stages:
-            return_data["props"] = self.sync_props(source_space_id, target_space_id)
+            return_data["props"] = await self.sync_props(
+                source_space_id, target_space_id
+            )
         if "types" in request.stages:
-            return_data["types"] = self.sync_types(
+            return_data["types"] = await self.sync_types(
                 source_space_id,
                 target_space_id,
             )
         if reload_data:
-            self.scan_space(SpaceEditRequest.target_space_name, target_space_id)
+            await self.scan_space(SpaceEditRequest.target_space_name, target_space_id)
 
         return return_data
 
-    def sync_props(self, source_space_id, target_space_id):
+    async def sync_props(self, source_space_id, target_space_id):
 
-        source_props = self.anytype.get_property_list(source_space_id)
+        source_props = await self.anytype.get_property_list(source_space_id)
 
-        target_props = self.anytype.get_property_list(target_space_id)
+        target_props = await self.anytype.get_property_list(target_space_id)
 
         source_keys = {val["key"] for val in source_props.values()}
         target_keys = {val["key"] for val in target_props.values()}
@@ -172,17 +313,17 @@ class SpaceService:
                 "name": prop["name"],
             }
             try:
-                new_prop_id = self.anytype.create_property(target_space_id, data)
+                new_prop_id = await self.anytype.create_property(target_space_id, data)
                 if prop["format"] in ["select", "multiselect"]:
-                    self.option_matching(target_space_id, prop, new_prop_id)
+                    await self.option_matching(target_space_id, prop, new_prop_id)
                 created_props[prop["name"]] = new_prop_id
 
-            except HTTPError as err:
-                if "already exists" in err.response:
+            except HTTPStatusError as err:
+                if "already exists" in err.response.text:
                     logger.info("Prop seems to exist, continuing")
 
         if "status" in source_keys:
-            self.option_matching(
+            await self.option_matching(
                 target_space_id,
                 source_props["Status"],
                 target_props["Status"],
@@ -190,16 +331,16 @@ class SpaceService:
 
         return created_props
 
-    def option_matching(self, space_id, prop: dict, target_prop_data: dict | str):
+    async def option_matching(self, space_id, prop: dict, target_prop_data: dict | str):
         if isinstance(target_prop_data, str):
             for option in prop["options"].values():
-                self.anytype.add_tag_to_select_property(
+                await self.anytype.add_tag_to_select_property(
                     space_id, target_prop_data, option
                 )
         else:
             for option_name, option in prop["options"].items():
                 if option_name not in target_prop_data["options"].keys():
-                    self.anytype.add_tag_to_select_property(
+                    await self.anytype.add_tag_to_select_property(
                         space_id, target_prop_data["id"], option
                     )
             #     if props[target][prop]["options"] == []:
@@ -244,9 +385,13 @@ class SpaceService:
 
             #
 
-    def sync_types(self, source_space_id, target_space_id):
-        source_types = self.anytype.get_types(source_space_id, DEFAULT_TYPES, True)
-        target_types = self.anytype.get_types(target_space_id, DEFAULT_TYPES, True)
+    async def sync_types(self, source_space_id, target_space_id):
+        source_types = await self.anytype.get_types(
+            source_space_id, DEFAULT_TYPES, True
+        )
+        target_types = await self.anytype.get_types(
+            target_space_id, DEFAULT_TYPES, True
+        )
 
         types_modified = {"Created": [], "Modified": [], "Unable": []}
 
@@ -259,7 +404,7 @@ class SpaceService:
             if source_data["layout"] not in ["basic", "profile", "action", "note"]:
                 types_modified["Unable"].append(any_type)
                 continue
-            self.anytype.create_type(target_space_id, source_data)
+            await self.anytype.create_type(target_space_id, source_data)
             types_modified["Created"].append(any_type)
 
         for any_type in STARTER_TYPES:
@@ -269,32 +414,37 @@ class SpaceService:
                     "icon": type_data["icon"],
                     "properties": type_data["properties"],
                 }
-                self.anytype.update_type(
+                await self.anytype.update_type(
                     target_space_id, target_types[any_type]["id"], any_type, data
                 )
                 types_modified["Modified"].append(any_type)
         return types_modified
 
-    def copy_objects(self, source_space_id, target_space_id, return_data: dict):
+    async def copy_objects(self, source_space_id, target_space_id, return_data: dict):
 
-        source_types = self.anytype.get_types(source_space_id, DEFAULT_TYPES, True)
-        target_types = self.anytype.get_types(target_space_id, DEFAULT_TYPES, True)
+        source_types = await self.anytype.get_types(
+            source_space_id, DEFAULT_TYPES, True
+        )
+        target_types = await self.anytype.get_types(
+            target_space_id, DEFAULT_TYPES, True
+        )
 
         objects_created = []
         for type_name, type_data in source_types.items():
             logger.info(f"Creating objects for {type_name}")
             if type_name not in target_types.keys():
                 continue
-            objects = self.anytype.search(
+            objects = self.anytype.iter_search(
                 source_space_id,
-                f"collecting all objects of type: {type_name}",
                 {"types": [type_data["id"]]},
+                f"collecting all objects of type: {type_name}",
             )
-            for object_name, object_id in objects.items():
+            async for found in objects:
+                object_name = found["name"]
                 logger.info(f"Creating objects for {object_name}")
-                object_dict = self.anytype.get_object_by_id(
-                    source_space_id, object_id, False
-                )["object"]
+                object_dict = await self.anytype.get_object_by_id(
+                    source_space_id, found["id"], False
+                )
                 obj_data = {
                     "name": object_dict["name"],
                     "type_key": (
@@ -317,7 +467,7 @@ class SpaceService:
 
                     obj_data["properties"].append(prop_data)
 
-                self.anytype.create_object(target_space_id, obj_data)
+                await self.anytype.create_object(target_space_id, obj_data)
                 objects_created.append(object_name)
 
         return objects_created
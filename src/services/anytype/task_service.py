@@ -1,145 +1,363 @@
 """Mask Management module"""
 
-from utils.anytype import AnyTypeUtils
-from utils.date_tools import get_next_date, get_today, unpack_time
+import asyncio
+from datetime import datetime, timedelta
+import time
+
+from models.data import TASK_SPACE, Watermark
+from utils.anytype import AsyncAnyTypeUtils
+from utils.date_tools import (
+    format_api_date,
+    get_next_date,
+    get_today,
+    next_due_dates,
+    parse_api_date,
+    unpack_time,
+)
+from utils.decoder import ObjectDecoder
+from utils.jobs import note_error, note_objects, note_phase
 from utils.logger import logger
 from utils.pushover import PushoverUtils
 
-
 RESET = "Reset Count"
 
+MODIFIED_DESC = {"property_key": "last_modified_date", "direction": "desc"}
+
+
+def _later(first: str | None, second: str) -> str:
+    """The later of two API date strings, the first may be unset"""
+    if first is None or parse_api_date(second) > parse_api_date(first):
+        return second
+    return first
+
 
 class TaskService:
     """For managing"""
 
-    def __init__(self, settings, journal=None):
+    def __init__(self, settings, journal=None, space_name: str = TASK_SPACE):
         self.settings = settings
         self.data = self.settings.data.anytype
-        self.space_id = self.settings.config.task_space_id
+        self.space_name = space_name
+        self.space_id = self.settings.config.task_spaces.get(space_name)
         self.max_reset = self.settings.config.task_review_threshold
-        self.anytype = AnyTypeUtils()
+        self.anytype = AsyncAnyTypeUtils()
         if settings.config.pushover:
             self.pushover = PushoverUtils()
         if journal:
             self.journal = journal
         self.tmw_str = get_next_date("1-day")
 
+    @property
+    def space(self):
+        """Space data of this service's task space, read on use like the rest"""
+        return self.data[self.space_name]
+
     def set_ready(self):
         return {
             "key": "status",
-            "select": self.data["tasks"].props["Status"].options["Ready"].id,
+            "select": self.space.props["Status"].options["Ready"].id,
         }
 
-    def recurrent_check(self):
-        """Collect tasks for processing"""
-        job_list = []
-        if self.settings.config.task_reset:
-            job_list.append("Shifted tasks")
-            logger.info("Running task processing")
-            tasks_to_check = self.anytype.get_list_view_objects(
-                self.space_id,
-                self.data["tasks"].queries["Automation"].id,
-                self.data["tasks"].queries["Automation"].Done,
-            )
+    def _decoder(self, *fields: str, keys: tuple[str, ...] = ()):
+        """
+        Decoder of task space objects for the named fields,
+        plus the props patched by key so writes can be diffed
+        """
+        props = self.space.props
+        names = [prop.name for prop in props.values() if prop.key in keys]
+        return ObjectDecoder(props, [*fields, *names])
 
-            for task in tasks_to_check:
-                next_date = None
-                if task.get("Rate") not in ["", None]:
-                    next_date = get_next_date(task["Rate"], task["name"])
-
-                self.task_status_reset(task, next_date)
-
-        if self.settings.config.timetagger:
-            job_list.append("Adding id to timers")
-            logger.info("Running id injection for timer")
-            objs_to_check = self.anytype.get_list_view_objects(
-                self.space_id,
-                self.data["tasks"].queries["Automation"].id,
-                self.data["tasks"].queries["Automation"].Timer,
+    def _log_fields(self):
+        """Fields journal logs read off a task, none when tasks are not logged"""
+        if not self.settings.config.task_logs:
+            return []
+        return self.settings.config.log_props
+
+    def _write_summary(self, writes):
+        """Job summary suffix for writes of the batch skipped or not gone through"""
+        notes = []
+        if writes.suppressed:
+            notes.append(f"{writes.suppressed} writes suppressed")
+        if writes.failures:
+            notes.append(f"{len(writes.failures)} writes failed")
+        return f" ({', '.join(notes)})" if notes else ""
+
+    async def recurrent_check(self):
+        """
+        Runs the enabled Automation view jobs side by side over one write batch,
+        objects showing in several views are fetched once.
+        Incremental runs only look at objects modified since the last run
+        """
+        mark, sweep, ids = None, True, None
+        if self.settings.config.recurrent_incremental:
+            mark = self.settings.data.watermarks.setdefault(
+                self._watermark_key(), Watermark()
             )
+            sweep = self._sweep_due(mark)
+            start = time.perf_counter()
+            ids, newest = await self.changes_since(mark, sweep)
+            note_phase(f"{self.space_name} changes", time.perf_counter() - start)
+            if ids is not None and not ids:
+                return f"Task Check Jobs skipped: no changes since {mark.modified}"
 
-            for obj in objs_to_check:
-                update_data = {
-                    "properties": [
-                        {
-                            "key": "timer",
-                            "url": self.settings.config.api_addr
-                            + "/timetagger/toggle_timer/"
-                            + obj["id"],
-                        },
-                        self.set_ready(),
-                    ]
-                }
-                self.anytype.update_object(
-                    self.space_id, obj["name"], obj["id"], update_data
-                )
-        if self.settings.config.habit_logs:
-            job_list.append("Adding id to habit url")
-            logger.info("Running id injection for habit")
-            habits_to_check = self.anytype.get_list_view_objects(
-                self.space_id,
-                self.data["tasks"].queries["Automation"].id,
-                self.data["tasks"].queries["Automation"].Habits,
+        phases = {}
+        if self.settings.config.task_reset:
+            phases["Shifted tasks"] = self.shift_done
+        # Timer and habit taps are served from the task_space_id space only
+        if self.settings.config.timetagger and self.space_name == TASK_SPACE:
+            phases["Adding id to timers"] = self.add_timer_ids
+        if self.settings.config.habit_logs and self.space_name == TASK_SPACE:
+            phases["Adding id to habit url"] = self.add_habit_urls
+
+        shared = {}
+        async with self.anytype.batch(self.space_id, self.space.props) as writes:
+            results = await asyncio.gather(
+                *(self._timed(phase(writes, shared, ids)) for phase in phases.values()),
+                return_exceptions=True,
             )
+            flush_start = time.perf_counter()
 
-            for habit in habits_to_check:
-                update_data = {
-                    "properties": [
-                        {
-                            "key": "url",
-                            "url": self.settings.config.api_addr
-                            + "/anytype/log_habit/"
-                            + habit["id"],
-                        },
-                        self.set_ready(),
-                    ]
-                }
-                self.anytype.update_object(
-                    self.space_id, habit["name"], habit["id"], update_data
+        timings = []
+        for name, result in zip(phases, results):
+            if isinstance(result, Exception):
+                logger.error(f"{name} failed: {result}")
+                continue
+            note_phase(f"{self.space_name} {name}", result)
+            timings.append(f"{name} {result:.2f}s")
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise errors[0]
+
+        flush_seconds = time.perf_counter() - flush_start
+        note_phase(f"{self.space_name} writes", flush_seconds)
+        timings.append(f"writes {flush_seconds:.2f}s")
+        if mark is not None:
+            failed = {**writes.unread, **writes.failures}
+            self._advance(mark, newest, sweep, ids, failed, writes.written)
+
+        summary = "Task Check Jobs completed"
+        if mark is not None:
+            summary += " (full sweep)" if sweep else f" ({len(ids)} changed)"
+        summary += ": " + ", ".join(timings)
+        return summary + self._write_summary(writes)
+
+    def _watermark_key(self) -> str:
+        """The task_space_id space keeps the key it had before spaces were named"""
+        if self.space_name == TASK_SPACE:
+            return "recurrent_check"
+        return f"recurrent_check {self.space_name}"
+
+    def _sweep_due(self, mark: Watermark) -> bool:
+        if mark.modified is None or mark.full_sweep is None:
+            return True
+        every = timedelta(minutes=self.settings.config.recurrent_full_sweep_minutes)
+        return datetime.now() - datetime.fromisoformat(mark.full_sweep) >= every
+
+    async def changes_since(self, mark: Watermark, sweep: bool = False):
+        """
+        Ids of task space objects modified after the watermark mapped to their
+        modified date, None on a sweep, with the newest modified date seen.
+        Search results come newest first so reading stops at the watermark,
+        a sweep only reads the newest
+        """
+        body = {"query": "", "sort": MODIFIED_DESC}
+        if not sweep:
+            body["filters"] = {
+                "operator": "and",
+                "conditions": [
+                    {
+                        "property_key": "last_modified_date",
+                        "condition": "gte",
+                        "date": mark.modified,
+                    }
+                ],
+            }
+        since = None if sweep else parse_api_date(mark.modified)
+        changed = {}
+        newest = mark.modified
+        async for obj in self.anytype.iter_search(
+            self.space_id, body, "modified objects"
+        ):
+            modified = self.anytype.listed_modified(obj)
+            if modified is None:
+                continue
+            newest = _later(newest, modified)
+            if sweep:
+                break
+            if parse_api_date(modified) <= since:
+                break
+            changed[obj["id"]] = modified
+        return (None if sweep else changed), newest
+
+    def _advance(self, mark: Watermark, newest, sweep: bool, changed, failed, written):
+        """
+        Moves the watermark once a run went through and saves it.
+        It goes past the run's own writes too, so the next run does not pick
+        them up as changes. Edits made elsewhere during the run, or in the
+        second the watermark lands on, wait for the next full sweep.
+        Objects that could not be read or written hold it just before the
+        oldest of their modified dates so the next run picks them up again,
+        a sweep with failures leaves it where it was and sweeps again
+        """
+        if failed:
+            changed = changed or {}
+            dates = [changed[object_id] for object_id in failed if object_id in changed]
+            if sweep or len(dates) < len(failed):
+                logger.warning(
+                    f"{len(failed)} objects failed, watermark kept at {mark.modified}"
                 )
+                return
+            oldest = min(parse_api_date(date) for date in dates)
+            newest = format_api_date(oldest - timedelta(seconds=1))
+            logger.warning(f"{len(failed)} objects failed, watermark held at {newest}")
+        else:
+            for modified in written.values():
+                newest = _later(newest, modified)
+        mark.modified = newest
+        if sweep:
+            mark.full_sweep = datetime.now().isoformat(timespec="seconds")
+        self.settings.data.file_sync()
 
-        return "Task Check Jobs completed: " + ", ".join(job_list)
+    async def _timed(self, job):
+        """Seconds a job took to run"""
+        start = time.perf_counter()
+        await job
+        return time.perf_counter() - start
 
-    def overdue(self):
+    async def shift_done(self, writes, shared=None, ids=None):
+        """Resets or deletes the tasks of the Done view"""
+        logger.info("Running task processing")
+        tasks_to_check = await self.anytype.get_list_view_objects(
+            self.space_id,
+            self.space.queries["Automation"].id,
+            self.space.queries["Automation"].Done,
+            from_view=self.settings.config.task_view_payloads,
+            required=("Status",),
+            decoder=self._decoder(
+                "Status",
+                "Rate",
+                RESET,
+                *self._log_fields(),
+                keys=("due_date",),
+            ),
+            shared=shared,
+            ids=ids,
+            failures=writes.unread,
+        )
+        note_objects(processed=len(tasks_to_check))
+
+        next_dates = next_due_dates(tasks_to_check, datetime.now())
+        for task in tasks_to_check:
+            next_date = next_dates[task["id"]]
+            if isinstance(next_date, AttributeError):
+                logger.warning(f"Skipping task: {next_date}")
+                note_error(str(next_date))
+                continue
+            await self.task_status_reset(task, next_date, writes)
+
+    async def add_timer_ids(self, writes, shared=None, ids=None):
+        """Points the timer url of Timer view objects at their toggle endpoint"""
+        logger.info("Running id injection for timer")
+        objs_to_check = await self.anytype.get_list_view_objects(
+            self.space_id,
+            self.space.queries["Automation"].id,
+            self.space.queries["Automation"].Timer,
+            from_view=self.settings.config.task_view_payloads,
+            decoder=self._decoder("Status", keys=("timer",)),
+            shared=shared,
+            ids=ids,
+            failures=writes.unread,
+        )
+        note_objects(processed=len(objs_to_check))
+
+        for obj in objs_to_check:
+            update_data = {
+                "properties": [
+                    {
+                        "key": "timer",
+                        "url": self.settings.config.api_addr
+                        + "/timetagger/toggle_timer/"
+                        + obj["id"],
+                    },
+                    self.set_ready(),
+                ]
+            }
+            writes.update(obj["name"], obj["id"], update_data, obj)
+
+    async def add_habit_urls(self, writes, shared=None, ids=None):
+        """Points the url of Habits view objects at their log endpoint"""
+        logger.info("Running id injection for habit")
+        habits_to_check = await self.anytype.get_list_view_objects(
+            self.space_id,
+            self.space.queries["Automation"].id,
+            self.space.queries["Automation"].Habits,
+            from_view=self.settings.config.task_view_payloads,
+            decoder=self._decoder("Status", keys=("url",)),
+            shared=shared,
+            ids=ids,
+            failures=writes.unread,
+        )
+        note_objects(processed=len(habits_to_check))
+
+        for habit in habits_to_check:
+            update_data = {
+                "properties": [
+                    {
+                        "key": "url",
+                        "url": self.settings.config.api_addr
+                        + "/anytype/log_habit/"
+                        + habit["id"],
+                    },
+                    self.set_ready(),
+                ]
+            }
+            writes.update(habit["name"], habit["id"], update_data, habit)
+
+    async def overdue(self):
         """Updates due date to tomorrow at 11pm so it will be 'today' upon viewing"""
         self.tmw_str = get_next_date("1-day")
-        tasks_to_check = self.anytype.get_list_view_objects(
+        tasks_to_check = await self.anytype.get_list_view_objects(
             self.space_id,
-            self.data["tasks"].queries["Automation"].id,
-            self.data["tasks"].queries["Automation"].Overdue,
+            self.space.queries["Automation"].id,
+            self.space.queries["Automation"].Overdue,
+            from_view=self.settings.config.task_view_payloads,
+            decoder=self._decoder("Status", "Rate", RESET, keys=("due_date",)),
         )
         if tasks_to_check is None:
             return "raise exception"
         if len(tasks_to_check) == 0:
             return "No tasks to update"
+        note_objects(processed=len(tasks_to_check))
 
-        for task in tasks_to_check:
-            new_due: str
-            if "Rate" in task and "@" in task["Rate"]:
-                hour, minute = unpack_time(task["Rate"].split("@")[1])
-                new_due = get_today([hour, minute], True)
-            else:
-                new_due = get_today(string=True)
-            data = {"properties": [{"key": "due_date", "date": new_due}]}
-            if self.max_reset > 0:
-                data = self.max_reset_cap(task, data)
+        async with self.anytype.batch(self.space_id, self.space.props) as writes:
+            for task in tasks_to_check:
+                new_due: str
+                if "Rate" in task and "@" in task["Rate"]:
+                    hour, minute = unpack_time(task["Rate"].split("@")[1])
+                    new_due = get_today([hour, minute], True)
+                else:
+                    new_due = get_today(string=True)
+                data = {"properties": [{"key": "due_date", "date": new_due}]}
+                if self.max_reset > 0:
+                    data = await self.max_reset_cap(task, data)
 
-            self.anytype.update_object(self.space_id, task["name"], task["id"], data)
+                writes.update(task["name"], task["id"], data, task)
 
-        return f"{len(tasks_to_check)} tasks with dates updated"
+        summary = f"{len(tasks_to_check)} tasks with dates updated"
+        return summary + self._write_summary(writes)
 
-    def max_reset_cap(self, task: dict, data: dict):
+    async def max_reset_cap(self, task: dict, data: dict):
         new_count = task[RESET] + 1 if RESET in task else 1
         data["properties"].append({"key": "reset_count", "number": new_count})
 
         if new_count >= self.max_reset:
             if self.settings.config.journal_space_id != "":
-                self.journal.review_overflow(task, self.space_id)
+                await self.journal.review_overflow(task, self.space_id)
 
             data["properties"].append(
                 {
                     "key": "status",
-                    "select": self.data["tasks"].props["Status"].options["Blocked"].id,
+                    "select": self.space.props["Status"].options["Blocked"].id,
                 }
             )
             data["properties"][0]["date"] = None
@@ -148,20 +366,21 @@ class TaskService:
 
         return data
 
-    def task_status_reset(self, task, next_date):
+    async def task_status_reset(self, task, next_date, writes):
         """
         Delete tasks that occur once
         Reset tasks that recur
         Update task based on reset count
+        Writes are queued on the given batch
         """
         if next_date is None:
-            self.anytype.delete_object(self.space_id, task["name"], task["id"])
+            writes.delete(task["name"], task["id"])
         else:
             update_data = {
                 "properties": [{"key": "due_date", "date": next_date}, self.set_ready()]
             }
             if task["Status"] == "Skipped" and self.max_reset > 0:
-                update_data = self.max_reset_cap(task, update_data)
+                update_data = await self.max_reset_cap(task, update_data)
                 new_due: str = ""
                 if "@" in task["Rate"]:
                     due_time = task["Rate"].split("@")[1]
@@ -181,16 +400,71 @@ class TaskService:
                     {"key": "reset_count", "number": 0},
                 )
 
-            self.anytype.update_object(
-                self.space_id, task["name"], task["id"], update_data
-            )
+            writes.update(task["name"], task["id"], update_data, task)
 
         if self.settings.config.task_logs and task["Status"] == "Done":
-            self.journal.log_object(task)
+            await self.journal.log_object(task)
 
-    def daily_rollover(self):
+    async def daily_rollover(self):
         """Daily automation script"""
         if self.settings.config.task_reset:
             logger.info("Running overdue tasks")
-            self.overdue()
+            await self.overdue()
         logger.info("Daily Rollover completed")
+
+
+class TaskSpaces:
+    """
+    Runs the task jobs over every configured task space side by side,
+    a space that fails does not stop the others
+    """
+
+    def __init__(self, settings, journal=None):
+        self.settings = settings
+        self.services = {
+            space_name: TaskService(settings, journal, space_name)
+            for space_name in settings.config.task_spaces
+        }
+
+    def __getitem__(self, space_name: str) -> TaskService:
+        return self.services[space_name]
+
+    async def recurrent_check(self):
+        return await self._fan_out("recurrent_check")
+
+    async def daily_rollover(self):
+        return await self._fan_out("daily_rollover")
+
+    async def _fan_out(self, job_name: str):
+        """
+        Result of the job per space, failed spaces get their error instead.
+        Raises when every space failed
+        """
+        names = list(self.services)
+        results = await asyncio.gather(
+            *(self._timed(getattr(self.services[name], job_name)()) for name in names)
+        )
+        summary, failures = {}, {}
+        for name, (seconds, result) in zip(names, results):
+            note_phase(name, seconds)
+            if isinstance(result, Exception):
+                logger.error(f"{job_name} failed for {name} ({seconds:.2f}s): {result}")
+                summary[name] = f"failed: {result}"
+                failures[name] = result
+                continue
+            logger.info(f"{job_name} for {name} took {seconds:.2f}s")
+            summary[name] = result
+        if failures and len(failures) == len(names):
+            raise next(iter(failures.values()))
+        for name, error in failures.items():
+            note_error(f"{name}: {type(error).__name__}: {error}")
+        return summary
+
+    async def _timed(self, job):
+        """Seconds a job took to run and what it returned or raised"""
+        start = time.perf_counter()
+        try:
+            result = await job
+        except Exception as e:
+            result = e
+        return time.perf_counter() - start, result
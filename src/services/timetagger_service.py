@@ -6,8 +6,8 @@ from ulid import ULID
 from models.data import ActiveTimer
 from models.timetagger_models import TimeEntry
 
-from utils.anytype import AnyTypeUtils
-from utils.api_tools import make_call
+from utils.anytype import AsyncAnyTypeUtils
+from utils.api_tools import make_async_call
 from utils.logger import logger
 from utils.pushover import PushoverUtils
 
@@ -26,22 +26,24 @@ class TimetaggerService:
         self.since = int(time.time())
         self.url = self.settings.config.timetagger_url + "/timetagger/api/v2"
         self.space_id = self.settings.config.task_space_id
-        self.anytype = AnyTypeUtils()
-        self.status_options = (
-            self.settings.data.anytype["tasks"].props["Status"].options
-        )
+        self.anytype = AsyncAnyTypeUtils()
 
         if settings.config.pushover:
             self.pushover = PushoverUtils()
 
+    @property
+    def status_options(self):
+        """Status options, read on use as space data may load after startup"""
+        return self.settings.data.anytype["tasks"].props["Status"].options
+
     def generate_key(self):
         return str(ULID())
 
-    def fetch_anytype_object(self, object_id: str):
-        return self.anytype.get_object_by_id(self.space_id, object_id)
+    async def fetch_anytype_object(self, object_id: str):
+        return await self.anytype.get_object_by_id(self.space_id, object_id)
 
-    def update_object(self, object_data, option_name: str):
-        self.anytype.update_object(
+    async def update_object(self, object_data, option_name: str):
+        await self.anytype.update_object(
             self.space_id,
             object_data["name"],
             object_data["id"],
@@ -52,10 +54,15 @@ class TimetaggerService:
             },
         )
 
-    def toggle(self, object_id: str):
+    async def toggle(self, object_id: str):
+        # Every toggle reads and rewrites the active timers, so they run one at a time
+        async with self.anytype.locked(self.space_id, "timers"):
+            return await self._toggle(object_id)
+
+    async def _toggle(self, object_id: str):
         logger.info("Preparing timer update data")
 
-        object_data = self.fetch_anytype_object(object_id)
+        object_data = await self.fetch_anytype_object(object_id)
 
         object_type = object_data["type"].lower()
 
@@ -69,7 +76,7 @@ class TimetaggerService:
         logger.info("Stopping current timer")
         if active is not None and active.anytype is not None:
             new_target = object_data["name"] != active.anytype["name"]
-            self.update_object(active.anytype, "Timed")
+            await self.update_object(active.anytype, "Timed")
             stopped_timer = self.record_builder(active.entry, False)
             entries_to_update.append(stopped_timer)
             message["⏹️Stopping"] = stopped_timer["ds"]
@@ -77,7 +84,7 @@ class TimetaggerService:
 
         logger.info("Creating new timer:" + str(new_target))
         if new_target:
-            self.update_object(object_data, "Doing")
+            await self.update_object(object_data, "Doing")
             new_timer = self.record_builder(object_data, True)
             entries_to_update.append(new_timer)
             self.data[object_type] = ActiveTimer(anytype=object_data, entry=new_timer)
@@ -86,7 +93,7 @@ class TimetaggerService:
         self.settings.data.file_sync()
 
         records_url = self.url + "/records"
-        make_call(
+        await make_async_call(
             "put",
             records_url,
             "updating timetagger timer",
@@ -2,11 +2,12 @@
 
 from functools import lru_cache
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Dict
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
-from models.data import ReferenceData
+from models.data import TASK_SPACE, ReferenceData
+from models.upstream_models import UpstreamConfig
 from utils.helper import Helper
 
 helper = Helper()
@@ -38,6 +39,17 @@ class ConfigSettings(BaseModel):
         ),
     ] = None
 
+    task_spaces: Annotated[
+        Dict[str, str],
+        Field(
+            description=(
+                "Task spaces by name to id, each scanned into its own space data "
+                "and processed side by side. task_space_id is the one named "
+                f"{TASK_SPACE}, the space timers and habits are run against"
+            ),
+        ),
+    ] = {}
+
     task_reset: Annotated[
         bool,
         Field(
@@ -45,6 +57,34 @@ class ConfigSettings(BaseModel):
         ),
     ] = False
 
+    task_view_payloads: Annotated[
+        bool,
+        Field(
+            description=(
+                "Read task job objects from their view listing, "
+                "fetching by id only when a needed field is missing"
+            ),
+        ),
+    ] = True
+
+    recurrent_incremental: Annotated[
+        bool,
+        Field(
+            description=(
+                "Only look at task space objects modified since the last recurrent "
+                "check, falling back to a full sweep every "
+                "recurrent_full_sweep_minutes"
+            ),
+        ),
+    ] = False
+
+    recurrent_full_sweep_minutes: Annotated[
+        int,
+        Field(
+            description="Minutes between full recurrent check sweeps when incremental",
+        ),
+    ] = 360
+
     # Pushover
     pushover: Annotated[
         bool,
@@ -110,6 +150,93 @@ class ConfigSettings(BaseModel):
         str, Field(description="URL to use to make calls to timetagger")
     ] = "http://timetagger:80"
 
+    # Caching
+    schema_cache_ttl: Annotated[
+        int,
+        Field(
+            description=(
+                "Seconds types, templates, properties and tags are reused "
+                "before being listed again. 0 is the off switch"
+            ),
+        ),
+    ] = 300
+
+    schema_cache_size: Annotated[
+        int,
+        Field(
+            description="Maximum number of cached schema listings across all spaces",
+        ),
+    ] = 256
+
+    object_cache_ttl: Annotated[
+        int,
+        Field(
+            description=(
+                "Seconds a fetched object is served locally, our own writes "
+                "drop it sooner. 0 is the off switch"
+            ),
+        ),
+    ] = 60
+
+    object_cache_size: Annotated[
+        int,
+        Field(description="Maximum number of cached objects across all spaces"),
+    ] = 4096
+
+    # Jobs
+    job_misfire_grace_seconds: Annotated[
+        int,
+        Field(
+            description=(
+                "Seconds a scheduled run may start late, e.g. after a restart, "
+                "before it is dropped. Missed runs are coalesced into one"
+            ),
+        ),
+    ] = 300
+
+    job_history_size: Annotated[
+        int,
+        Field(description="Number of finished job runs kept for /general/jobs/history"),
+    ] = 100
+
+    job_history_file: Annotated[
+        str,
+        Field(
+            description=(
+                "File the job history is saved to and reloaded from, "
+                "empty keeps it in memory only"
+            ),
+        ),
+    ] = ""
+
+    space_rescan_minutes: Annotated[
+        int,
+        Field(
+            description=(
+                "Minutes between incremental rescans of scanned spaces, keeping "
+                "type, template, property and tag ids fresh. 0 is the off switch"
+            ),
+        ),
+    ] = 0
+
+    # Transport
+    upstreams: Annotated[
+        Dict[str, UpstreamConfig],
+        Field(
+            description=(
+                "Connection pool settings per upstream target: "
+                "anytype, timetagger, pushover"
+            ),
+        ),
+    ] = {}
+
+    @model_validator(mode="after")
+    def _name_task_space(self):
+        """Files task_space_id with the other task spaces"""
+        if self.task_space_id and TASK_SPACE not in self.task_spaces:
+            self.task_spaces = {TASK_SPACE: self.task_space_id, **self.task_spaces}
+        return self
+
 
 class Settings(BaseModel):
     """The Top-Level Singleton Registry"""
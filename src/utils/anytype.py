@@ -1,86 +1,540 @@
 """Utility module for anytype, abstracted for common tasks"""
 
-from utils.api_tools import make_call
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import partial, wraps
+
+from httpx import HTTPError
+
+from utils.api_tools import make_async_call
+from utils.cache import object_cache, schema_cache
+from utils.decoder import PLAIN_FORMATS, ObjectDecoder, read_multiselect, read_select
+from utils.exception import AnytypeException
+from utils.jobs import note_objects
 from utils.logger import logger
-
+from utils.single_flight import AsyncKeyedLock
+from utils.transport import upstream_config
 
 URL = "/v1/spaces/"
 OBJ = "/objects/"
 PROPS = "/properties/"
 
+# The API's largest page, a page is the most listing data held at once
+PAGE_SIZE = 1000
+
+# Name unpack_object gives the last_modified_date property
+MODIFIED = "Last modified date"
+
+_MISSING = object()
+
+object_locks = AsyncKeyedLock()
+
+
+def _same_moment(first: str, second: str) -> bool:
+    """Compares two API date strings, whatever their offset notation"""
+    try:
+        return datetime.fromisoformat(first) == datetime.fromisoformat(second)
+    except (TypeError, ValueError):
+        return first == second
+
+
+def invalidates(*kinds: str):
+    """
+    Drops the cached schema kinds of the call's space once a write returns,
+    templates are objects too so object deletes drop them
+    """
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self, space_id, *args, **kwargs):
+            try:
+                return await func(self, space_id, *args, **kwargs)
+            finally:
+                schema_cache.invalidate(space_id, *kinds)
+
+        return wrapper
+
+    return decorator
+
+
+class AnyTypeFormatter:
+    """
+    Response formatting behind the Anytype client
+    """
+
+    def unpack_object(self, object_obj: dict, sub_objects: bool = True):
+        """Pulls out name, id, and properties for use"""
+        object_dict = {
+            "name": object_obj["name"],
+            "id": object_obj["id"],
+            "type": object_obj["type"]["name"],
+        }
+        for prop in object_obj["properties"]:
+            prop_type = prop["format"]
+            prop_value = None
+            # Basic props that match their type
+            if prop_type in PLAIN_FORMATS:
+                prop_value = prop[prop_type]
+
+            elif prop_type == "select":
+                prop_value = read_select(prop)
+
+            elif prop_type == "multiselect":
+                prop_value = read_multiselect(prop)
+
+            elif prop_type == "objects" and sub_objects is True:
+                continue
+            object_dict[prop["name"]] = prop_value
+
+        return object_dict
+
+    def _format_search_entry(self, obj: dict, simple: bool):
+        return obj["id"] if simple else self.unpack_object(obj, False)
+
+    def _page_url(self, url: str, offset: int, page_size: int):
+        return url + ("&" if "?" in url else "?") + f"offset={offset}&limit={page_size}"
+
+    def _page_items(self, page) -> list:
+        return (page or {}).get("data") or []
+
+    def _next_offset(self, page, offset: int):
+        """Offset of the following page, None once the pagination metadata ends"""
+        items = self._page_items(page)
+        if not items or not (page.get("pagination") or {}).get("has_more"):
+            return None
+        return offset + len(items)
+
+    def _format_type(self, type_obj: dict, props: bool):
+        type_dict = {"id": type_obj["id"], "key": type_obj["key"]}
+        if props:
+            type_dict["plural_name"] = type_obj["plural_name"]
+            type_dict["layout"] = type_obj["layout"]
+            type_dict["name"] = type_obj["name"]
+            type_dict["icon"] = type_obj["icon"]
+            type_dict["properties"] = []
+            for prop in type_obj["properties"]:
+                type_dict["properties"].append(
+                    {
+                        "key": prop["key"],
+                        "name": prop["name"],
+                        "format": prop["format"],
+                    }
+                )
+        return type_dict
+
+    def _format_templates(self, type_dict: dict, type_templates):
+        if type_templates is not None:
+            type_dict["templates"] = {}
+        for template in type_templates["data"]:
+            type_dict["templates"][template["name"]] = template["id"]
+
+    def _select_types(self, types, system_types, props: bool):
+        """Non system types and their formatted dicts, before templates are added"""
+        system_types = [] if system_types is None else system_types
+        selected = [
+            type_obj
+            for type_obj in (types["data"] if types is not None else [])
+            if type_obj["name"] not in system_types
+        ]
+        return selected, [self._format_type(type_obj, props) for type_obj in selected]
+
+    def _format_lists(self, list_ids: dict, view_lists: list):
+        query_dict = {}
+        for (list_name, list_id), view_list in zip(list_ids.items(), view_lists):
+            query_dict[list_name] = {"id": list_id}
+            for view in view_list:
+                query_dict[list_name][view["name"]] = view["id"]
+        return query_dict
+
+    def _select_props(self, props, system_props):
+        """Formatted non system props, before select options are added"""
+        system_props = [] if system_props is None else system_props
+        formatted_props = {}
+        data = props["data"] if props is not None else None
+        for prop in data or []:
+            if prop["name"] in system_props:
+                continue
+            formatted_props[prop["name"]] = self._format_prop(prop)
+        return formatted_props
+
+    def _format_views(self, views):
+        views_formatted = []
+
+        for view in views["data"] if views is not None else []:
+            views_formatted.append({"name": view["name"], "id": view["id"]})
+
+        return views_formatted
+
+    def _format_prop(self, prop: dict):
+        return {
+            "id": prop["id"],
+            "key": prop["key"],
+            "name": prop["name"],
+            "format": prop["format"],
+        }
+
+    def _format_tag(self, tag: dict):
+        return {
+            "id": tag["id"],
+            "key": tag["key"],
+            "name": tag["name"],
+            "color": tag["color"],
+        }
+
+    def _format_tags(self, tags):
+        formatted_tags = {}
+        if tags["data"]:
+            for tag in tags["data"]:
+                formatted_tags[tag["name"]] = self._format_tag(tag)
+            return formatted_tags
+        return {}
+
+    def _split_fetched(self, object_ids: list[str], results: list):
+        """Separates fetched objects, kept in order, from the errors of failed ids"""
+        objects = []
+        failures = {}
+        for object_id, result in zip(object_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Could not fetch object {object_id}: {result}")
+                failures[object_id] = str(result)
+            else:
+                objects.append(result)
+        if failures:
+            logger.warning(f"{len(failures)} of {len(object_ids)} objects not fetched")
+        return objects, failures
+
+    def _unpack_view(
+        self,
+        rows: list[dict],
+        required: tuple[str, ...],
+        decoder: ObjectDecoder | None = None,
+    ):
+        """
+        Unpacks view rows in place of a fetch, or decodes them into records,
+        None where a row lacks a field
+        """
+        unpacked = []
+        for row in rows:
+            obj = None
+            if row.get("properties") is not None:
+                obj = decoder.decode(row) if decoder else self.unpack_object(row, False)
+                if any(field not in obj for field in required):
+                    obj = None
+            unpacked.append(obj)
+        return unpacked
+
+    def _merge_fetched(
+        self,
+        rows: list[dict],
+        unpacked: list,
+        fetched: list[dict],
+        decoder: ObjectDecoder | None = None,
+    ):
+        """
+        Fills the gaps of _unpack_view with fetched objects, dropping failures,
+        as records when decoding
+        """
+        by_id = {obj["id"]: obj for obj in fetched}
+        merged = []
+        for row, obj in zip(rows, unpacked):
+            if obj is None:
+                obj = by_id.get(row["id"])
+                if obj is not None and decoder:
+                    obj = decoder.from_dict(obj)
+            if obj is not None:
+                merged.append(obj)
+        return merged
+
+    @staticmethod
+    def listed_modified(row: dict):
+        """Last modified date a listing row carries, None without properties"""
+        for prop in row.get("properties") or []:
+            if prop.get("key") == "last_modified_date":
+                return prop.get("date")
+        return None
+
+    def _cache_objects(self, space_id: str, objects: list):
+        for obj in objects:
+            if obj is not None:
+                object_cache.put(space_id, obj, obj.get(MODIFIED))
+
+    def _cached_rows(
+        self,
+        space_id: str,
+        rows: list[dict],
+        unpacked: list,
+        required=(),
+        decoder: ObjectDecoder | None = None,
+    ):
+        """
+        Fills the gaps of _unpack_view from the object cache, only with copies
+        as recent as the listing and holding the required fields
+        """
+        filled = []
+        for row, obj in zip(rows, unpacked):
+            if obj is None:
+                obj = object_cache.get_object(
+                    space_id, row["id"], self.listed_modified(row)
+                )
+                if obj is not None and any(field not in obj for field in required):
+                    obj = None
+                if obj is not None and decoder:
+                    obj = decoder.from_dict(obj)
+            filled.append(obj)
+        return filled
+
+    def _cache_written(self, space_id: str, response):
+        """Caches the object a write returned"""
+        obj = response.get("object") if isinstance(response, dict) else None
+        if isinstance(obj, dict) and obj.get("properties") is not None:
+            self._cache_objects(space_id, [self.unpack_object(obj, False)])
+
+    def _format_new_tag(self, new_tag):
+        formatted_tag = {}
+        if new_tag["tag"]:
+            formatted_tag[new_tag["tag"]["name"]] = self._format_tag(new_tag["tag"])
+        return formatted_tag
+
+
+class WriteBatch:
+    """
+    Object writes of one space gathered for a single flush.
+    Patches to the same id merge, the later value winning per property key,
+    and a delete replaces anything pending for its id.
+    Given the space props, property values the object already holds are dropped
+    and a patch left empty is never sent
+    """
+
+    def __init__(self, space_id: str, props: dict | None = None):
+        self.space_id = space_id
+        self.props = {prop.key: prop for prop in (props or {}).values()}
+        self.pending: dict[str, dict] = {}
+        self.outcomes: dict[str, str] = {}
+        # Objects the run could not read for this batch, with their error
+        self.unread: dict[str, str] = {}
+        # Modified date each update left its object at, as the API replied
+        self.written: dict[str, str] = {}
+
+    def _readable(self, prop: dict):
+        """Patch value the way unpack_object reads it, _MISSING if it can't say"""
+        schema = self.props.get(prop["key"])
+        if schema is None or schema.format not in prop:
+            return _MISSING
+        value = prop[schema.format]
+        if value is None or schema.format not in ("select", "multiselect"):
+            return value
+        names = {}
+        for option in (schema.options or {}).values():
+            names[option.id] = names[option.key] = option.name
+        if schema.format == "select":
+            return names.get(value, _MISSING)
+        if any(tag not in names for tag in value):
+            return _MISSING
+        return sorted(names[tag] for tag in value)
+
+    def _unchanged(self, prop: dict, current: dict) -> bool:
+        value = self._readable(prop)
+        if value is _MISSING:
+            return False
+        schema = self.props[prop["key"]]
+        if schema.name not in current:
+            return False
+        held = current[schema.name]
+        if schema.format == "multiselect" and isinstance(held, list):
+            held = sorted(held)
+        elif schema.format == "date" and value and held:
+            return _same_moment(value, held)
+        return held == value
+
+    def update(
+        self, object_name: str, object_id: str, data: dict, current: dict | None = None
+    ):
+        """
+        Queues a patch, current is the object as last fetched and lets
+        properties that would not change be left out
+        """
+        entry = self.pending.setdefault(
+            object_id, {"name": object_name, "delete": False, "data": {}}
+        )
+        if entry["delete"]:
+            return
+        merged = entry["data"]
+        props = {prop["key"]: prop for prop in merged.get("properties", [])}
+        for prop in data.get("properties", []):
+            if current is not None and self._unchanged(prop, current):
+                props.pop(prop["key"], None)
+            else:
+                props[prop["key"]] = prop
+        merged.update(
+            {key: value for key, value in data.items() if key != "properties"}
+        )
+        merged.pop("properties", None)
+        if props:
+            merged["properties"] = list(props.values())
+
+    def delete(self, object_name: str, object_id: str):
+        self.pending[object_id] = {"name": object_name, "delete": True, "data": None}
+
+    def take(self):
+        """Empties the batch, returning the writes that still change something"""
+        pending, self.pending = self.pending, {}
+        writes = {}
+        for object_id, entry in pending.items():
+            if entry["delete"] or entry["data"]:
+                writes[object_id] = entry
+            else:
+                self.outcomes[object_id] = "unchanged"
+        if len(writes) < len(pending):
+            logger.info(f"{len(pending) - len(writes)} object writes suppressed")
+            note_objects(unchanged=len(pending) - len(writes))
+        return writes
+
+    def record(self, writes: dict, results: list):
+        """
+        Stores each id's outcome, updated, deleted or the error,
+        and the modified date of each updated object
+        """
+        failed = deleted = 0
+        for (object_id, entry), result in zip(writes.items(), results):
+            if isinstance(result, Exception):
+                logger.warning(f"Could not write object ({entry['name']}): {result}")
+                self.outcomes[object_id] = str(result)
+                failed += 1
+            else:
+                self.outcomes[object_id] = "deleted" if entry["delete"] else "updated"
+                deleted += entry["delete"]
+                obj = result.get("object") if isinstance(result, dict) else None
+                modified = AnyTypeFormatter.listed_modified(obj or {})
+                if modified is not None:
+                    self.written[object_id] = modified
+        note_objects(
+            updated=len(writes) - failed - deleted, deleted=deleted, failed=failed
+        )
+        if failed:
+            logger.warning(f"{failed} of {len(writes)} object writes failed")
+
+    @property
+    def suppressed(self) -> int:
+        return sum(outcome == "unchanged" for outcome in self.outcomes.values())
+
+    @property
+    def failures(self) -> dict[str, str]:
+        return {
+            object_id: outcome
+            for object_id, outcome in self.outcomes.items()
+            if outcome not in ("updated", "deleted", "unchanged")
+        }
 
-class AnyTypeUtils:
+
+class AsyncAnyTypeUtils(AnyTypeFormatter):
     """
-    Pulls views for automation, refer to anytype service
-    Pulls object details in views in views
-    Updates tasks with provided data
+    Anytype API client for use on the event loop,
+    every call goes through make_async_call
     """
 
-    def test(self, data):
+    async def test(self, data):
         """Play area for momentary tasks"""
-        test = self.get_tags_from_prop(data["space"], data["prop"])
+        test = await self.get_tags_from_prop(data["space"], data["prop"])
         return test
 
-    def search(
+    async def _iter_pages(
+        self, category: str, url: str, info: str, data=None, page_size=None
+    ):
+        """Yields every item of a paginated listing, one page requested at a time"""
+        page_size = page_size or PAGE_SIZE
+        offset = 0
+        while offset is not None:
+            page = await make_async_call(
+                category, self._page_url(url, offset, page_size), info, data
+            )
+            for item in self._page_items(page):
+                yield item
+            offset = self._next_offset(page, offset)
+
+    async def iter_search(
         self,
-        space_id,
-        search_name,
+        space_id: str,
         search_body: dict,
-        simple: bool = True
+        search_name: str = "objects",
+        page_size: int | None = None,
     ):
-        """Returns all objects by type"""
+        """Yields raw search results page by page"""
         url = URL + space_id
-        url += "/search?limit=999"
-        objects = make_call("post", url, f"searching for {search_name}", search_body)
+        url += "/search"
+        async for obj in self._iter_pages(
+            "post", url, f"searching for {search_name}", search_body, page_size
+        ):
+            yield obj
+
+    async def iter_view_objects(
+        self, space_id: str, list_id: str, view_id: str, page_size: int | None = None
+    ):
+        """Yields the raw rows of a view (query) page by page"""
+        obj_url = URL + space_id
+        obj_url += "/lists/" + list_id
+        obj_url += "/views/" + view_id
+        obj_url += "/objects"
+        async for row in self._iter_pages(
+            "get", obj_url, "get obj", page_size=page_size
+        ):
+            yield row
+
+    async def search(
+        self, space_id, search_name, search_body: dict, simple: bool = True
+    ):
+        """Returns all objects by type"""
+        return {
+            obj["name"]: self._format_search_entry(obj, simple)
+            async for obj in self.iter_search(space_id, search_body, search_name)
+        }
 
-        if objects is not None and objects["data"] is None:
-            return "No objects found"
+    async def _bounded(self, calls: list, fan_out: int | None = None):
+        """Awaits zero argument calls with at most fan_out running, results in order"""
+        limit = asyncio.Semaphore(fan_out or upstream_config("anytype").fan_out)
 
-        formatted_objects = {}
-        for obj in objects["data"] if objects is not None else []:
-            if simple:
-                formatted_objects[obj["name"]] = obj["id"]
-            else:
-                formatted_objects[obj["name"]] = self.unpack_object(obj, False)
+        async def run(call):
+            async with limit:
+                return await call()
 
-        return formatted_objects
+        return await asyncio.gather(*(run(call) for call in calls))
 
-    def get_types(self, space_id, system_types=None, props: bool = False):
+    async def get_types(
+        self,
+        space_id,
+        system_types=None,
+        props: bool = False,
+        fan_out: int | None = None,
+        templates: bool = True,
+    ):
+        """Formatted non system types, with their templates unless turned off"""
         types_url = URL + space_id
         types_url += "/types"
 
-        types = make_call("get", types_url, "get types from space")
-        types_formatted = {}
-
-        system_types = [] if system_types is None else system_types
-        for type_obj in types["data"] if types is not None else []:
-            if type_obj["name"] in system_types:
-                continue
-            type_dict = {"id": type_obj["id"], "key": type_obj["key"]}
-            if props:
-                type_dict["plural_name"] = type_obj["plural_name"]
-                type_dict["layout"] = type_obj["layout"]
-                type_dict["name"] = type_obj["name"]
-                type_dict["icon"] = type_obj["icon"]
-                type_dict["properties"] = []
-                for prop in type_obj["properties"]:
-                    type_dict["properties"].append(
-                        {
-                            "key": prop["key"],
-                            "name": prop["name"],
-                            "format": prop["format"],
-                        }
-                    )
-            type_templates = self.get_templates(space_id, type_dict["id"])
-            if type_templates is not None:
-                type_dict["templates"] = {}
-            for template in type_templates["data"]:
-                type_dict["templates"][template["name"]] = template["id"]
-            types_formatted[type_obj["name"]] = type_dict
+        types = await schema_cache.get_or_load_async(
+            (space_id, "types"),
+            lambda: make_async_call("get", types_url, "get types from space"),
+        )
+        selected, type_dicts = self._select_types(types, system_types, props)
+        if templates:
+            await self.add_templates(space_id, type_dicts, fan_out)
+        return {
+            type_obj["name"]: type_dict
+            for type_obj, type_dict in zip(selected, type_dicts)
+        }
 
-        return types_formatted
+    async def add_templates(
+        self, space_id: str, type_dicts: list[dict], fan_out: int | None = None
+    ):
+        """Fetches templates onto formatted type dicts, fan_out types at a time"""
+        type_templates = await self._bounded(
+            [partial(self.get_templates, space_id, t["id"]) for t in type_dicts],
+            fan_out,
+        )
+        for type_dict, templates in zip(type_dicts, type_templates):
+            self._format_templates(type_dict, templates)
 
-    def get_templates(
+    async def get_templates(
         self,
         space_id,
         type_id,
@@ -89,22 +543,25 @@ class AnyTypeUtils:
         templates_url += "/types/" + type_id
         templates_url += "/templates"
 
-        templates = make_call("get", templates_url, "get templates from type")
+        templates = await schema_cache.get_or_load_async(
+            (space_id, "templates", type_id),
+            lambda: make_async_call("get", templates_url, "get templates from type"),
+        )
 
         return templates
 
-    def get_lists(self, space_id, query_type_id):
-        list_ids = self.search(space_id, "collect queries", {"types": [query_type_id]})
+    async def get_lists(self, space_id, query_type_id, fan_out: int | None = None):
+        list_ids = await self.search(
+            space_id, "collect queries", {"types": [query_type_id]}
+        )
 
-        query_dict = {}
-        for list_id in list_ids:
-            query_dict[list_id] = {"id": list_ids[list_id]}
-            view_list = self.get_views_list(space_id, list_ids[list_id])
-            for view in view_list:
-                query_dict[list_id][view["name"]] = view["id"]
-        return query_dict
+        view_lists = await self._bounded(
+            [partial(self.get_views_list, space_id, i) for i in list_ids.values()],
+            fan_out,
+        )
+        return self._format_lists(list_ids, view_lists)
 
-    def get_views_list(
+    async def get_views_list(
         self,
         space_id: str,
         list_id: str,
@@ -114,89 +571,178 @@ class AnyTypeUtils:
         views_url += "/lists/" + list_id
         views_url += "/views"
 
-        views = make_call("get", views_url, "get view list for query")
-        views_formatted = []
-
-        for view in views["data"] if views is not None else []:
-            views_formatted.append({"name": view["name"], "id": view["id"]})
+        views = [
+            view
+            async for view in self._iter_pages(
+                "get", views_url, "get view list for query"
+            )
+        ]
 
-        return views_formatted
+        return self._format_views({"data": views})
 
-    def get_list_view_objects(
+    async def get_list_view_objects(
         self,
         space_id: str,
         list_id: str,
         view_id: str,
+        fan_out: int | None = None,
+        from_view: bool = False,
+        required: tuple[str, ...] = (),
+        decoder: ObjectDecoder | None = None,
+        shared: dict | None = None,
+        ids=None,
+        failures: dict | None = None,
     ):
-        """Pulls out detailed information of objects in a view (query)"""
-        obj_url = URL + space_id
-        obj_url += "/lists/" + list_id
-        obj_url += "/views/" + view_id
-        obj_url += "/objects"
-        main_obj = make_call("get", obj_url, "get obj")
-
-        objs_to_check = []
-
-        if main_obj and "data" in main_obj:
-            logger.info(f"Found {len(main_obj['data'])} objects")
-
-            for obj in main_obj["data"]:
-                objs_to_check.append(self.get_object_by_id(space_id, obj["id"]))
+        """
+        Pulls out detailed information of objects in a view (query),
+        objects that fail to load are logged and left out.
+        from_view unpacks the listing itself, fetching by id only the rows
+        missing properties or a required field.
+        A decoder returns records of just its fields in place of full dicts,
+        shared is handed to fetch_objects and ids limits the rows to those objects.
+        failures collects the ids that could not be fetched with their error
+        """
+        rows = [row async for row in self.iter_view_objects(space_id, list_id, view_id)]
+        if ids is not None:
+            rows = [row for row in rows if row["id"] in ids]
+        logger.info(f"Found {len(rows)} objects")
+
+        unpacked = (
+            self._unpack_view(rows, required, decoder)
+            if from_view
+            else [None] * len(rows)
+        )
+        if decoder is None:
+            self._cache_objects(space_id, unpacked)
+        unpacked = self._cached_rows(space_id, rows, unpacked, required, decoder)
+        missing = [row["id"] for row, obj in zip(rows, unpacked) if obj is None]
+        fetched = []
+        if missing:
+            fetched, failed = await self.fetch_objects(
+                space_id, missing, fan_out, shared
+            )
+            if failures is not None:
+                failures.update(failed)
+        return self._merge_fetched(rows, unpacked, fetched, decoder)
+
+    async def fetch_objects(
+        self,
+        space_id: str,
+        object_ids: list[str],
+        fan_out: int | None = None,
+        shared: dict | None = None,
+    ):
+        """
+        Pulls objects by id with at most fan_out requests in flight, in the order given
+        Returns the objects and a dict of failed ids to their error.
+        shared holds the fetches of a run by id, done or in flight, so concurrent
+        callers pull each object once
+        """
+
+        async def pull(object_id):
+            try:
+                return await self.get_object_by_id(space_id, object_id)
+            except (AnytypeException, HTTPError) as err:
+                return err
+
+        async def fetch(object_id):
+            if shared is None:
+                return await pull(object_id)
+            if object_id not in shared:
+                shared[object_id] = asyncio.ensure_future(pull(object_id))
+            return await asyncio.shield(shared[object_id])
+
+        results = await self._bounded(
+            [partial(fetch, object_id) for object_id in object_ids], fan_out
+        )
+        return self._split_fetched(object_ids, results)
 
-        return objs_to_check
+    @asynccontextmanager
+    async def batch(
+        self, space_id: str, props: dict | None = None, fan_out: int | None = None
+    ):
+        """
+        Collects update and delete writes, flushed with at most fan_out in flight
+        as the block exits, outcomes end up on the batch.
+        With the space props, patches are diffed against the objects passed along
+        """
+        writes = WriteBatch(space_id, props)
+        try:
+            yield writes
+        finally:
+            await self.flush(writes, fan_out)
+
+    async def flush(self, writes: WriteBatch, fan_out: int | None = None):
+        """Sends every pending write of the batch, one call per object"""
+
+        async def write(object_id, entry):
+            try:
+                if entry["delete"]:
+                    return await self.delete_object(
+                        writes.space_id, entry["name"], object_id
+                    )
+                return await self.update_object(
+                    writes.space_id, entry["name"], object_id, entry["data"]
+                )
+            except (AnytypeException, HTTPError) as err:
+                return err
+
+        pending = writes.take()
+        results = await self._bounded(
+            [partial(write, object_id, entry) for object_id, entry in pending.items()],
+            fan_out,
+        )
+        writes.record(pending, results)
+        return writes.outcomes
 
-    def create_type(self, space_id, type_data: dict):
+    @invalidates("types")
+    async def create_type(self, space_id, type_data: dict):
         """Creates a type with the provided data"""
         type_url = URL + space_id
         type_url += "/types"
         type_dict = type_data.copy()
         del type_dict["id"]
 
-        make_call("post", type_url, f'create type {type_dict["name"]}', type_dict)
+        await make_async_call(
+            "post", type_url, f'create type {type_dict["name"]}', type_dict
+        )
 
-    def delete_type(self, space_id, type_data: dict):
+    @invalidates("types", "templates")
+    async def delete_type(self, space_id, type_data: dict):
         """Creates a type with the provided data"""
         type_url = URL + space_id
         type_url += "/types/" + type_data["id"]
 
-        make_call("delete", type_url, f'delete type {type_data["key"]}')
+        await make_async_call("delete", type_url, f'delete type {type_data["key"]}')
 
-    def update_type(self, space_id: str, type_id: str, type_name: str, type_data: dict):
+    @invalidates("types")
+    async def update_type(
+        self, space_id: str, type_id: str, type_name: str, type_data: dict
+    ):
         """Patches a type with the provided data"""
         type_url = URL + space_id
         type_url += "/types/" + type_id
 
-        make_call("patch", type_url, f"update type {type_name}", type_data)
+        await make_async_call("patch", type_url, f"update type {type_name}", type_data)
 
-    def unpack_object(self, object_obj: dict, sub_objects: bool = True):
-        """Pulls out name, id, and properties for use"""
-        object_dict = {
-            "name": object_obj["name"],
-            "id": object_obj["id"],
-            "type": object_obj["type"]["name"],
-        }
-        for prop in object_obj["properties"]:
-            prop_type = prop["format"]
-            prop_value = None
-            # Basic props that match their type
-            if prop_type in ["checkbox", "date", "number", "text", "url"]:
-                prop_value = prop[prop_type]
-
-            elif prop_type in ["select", "multiselect"]:
-                prop_value = prop[prop_type]["name"]
-
-            elif prop_type == "objects" and sub_objects is True:
-                continue
-            object_dict[prop["name"]] = prop_value
-
-        return object_dict
+    async def get_object_by_id(
+        self, space_id: str, object_id: str, simple: bool = True, cached: bool = True
+    ):
+        """
+        Pulls detailed object data by id, simple reads use the object cache
+        unless cached is off
+        """
+        if simple and cached:
+            hit = object_cache.get_object(space_id, object_id)
+            if hit is not None:
+                return hit
 
-    def get_object_by_id(self, space_id: str, object_id: str, simple: bool = True):
-        """Pulls detailed object data by id"""
         object_url = URL + space_id
         object_url += OBJ + object_id
 
-        object_obj = make_call("get", object_url, "get object by id")["object"]
+        object_obj = (await make_async_call("get", object_url, "get object by id"))[
+            "object"
+        ]
 
         if object_obj is None:
             return "raise exception"
@@ -208,103 +754,121 @@ class AnyTypeUtils:
 
         if simple:
             object_formatted = self.unpack_object(object_obj, False)
+            self._cache_objects(space_id, [object_formatted])
             return object_formatted
 
         return object_obj
 
-    def update_object(self, space_id, object_name: str, object_id: str, data: dict):
-        """Updates object with provided data"""
+    def locked(self, space_id: str, object_id: str):
+        """
+        Runs read-modify-write handlers of the same object one after the other,
+        so overlapping calls never write back values read before the other's write
+        """
+        return object_locks.hold((space_id, object_id))
+
+    async def update_object(
+        self, space_id, object_name: str, object_id: str, data: dict
+    ):
+        """Updates object with provided data, caching the object returned"""
         object_url = URL + space_id
         object_url += OBJ + object_id
-        return make_call(
-            "patch", object_url, f"update object ({object_name}) by id", data
-        )
-
-    def create_object(self, space_id: str, data: dict):
+        try:
+            response = await make_async_call(
+                "patch", object_url, f"update object ({object_name}) by id", data
+            )
+        finally:
+            object_cache.discard((space_id, object_id))
+        self._cache_written(space_id, response)
+        return response
+
+    async def create_object(self, space_id: str, data: dict):
         """Creates object with provided data"""
         object_url = URL + space_id
         object_url += "/objects"
-        return make_call(
+        return await make_async_call(
             "post",
             object_url,
             f"create object {data['name']} with {data['type_key']} data",
             data,
         )
 
-    def delete_object(self, space_id, object_name: str, object_id: str):
+    @invalidates("templates")
+    async def delete_object(self, space_id, object_name: str, object_id: str):
         """Deletes object by id"""
         object_url = URL + space_id
         object_url += OBJ + object_id
-        return make_call(
-            "delete",
-            object_url,
-            f"delete object ({object_name}) by id",
-        )
-
-    def get_property_list(self, space_id, system_props=None):
-        """Returns a list of all the properties of a space and their properties"""
+        try:
+            return await make_async_call(
+                "delete",
+                object_url,
+                f"delete object ({object_name}) by id",
+            )
+        finally:
+            object_cache.discard((space_id, object_id))
+
+    async def get_property_list(
+        self,
+        space_id,
+        system_props=None,
+        fan_out: int | None = None,
+        options: bool = True,
+    ):
+        """
+        Returns a list of all the properties of a space and their properties,
+        with the options of select props unless turned off
+        """
         prop_url = URL + space_id
         prop_url += PROPS
-        props = make_call("get", prop_url, f"get props from space {space_id}")
-        system_props = [] if system_props is None else system_props
-        formatted_props = {}
-        if props["data"]:
-            for prop in props["data"]:
-                if prop["name"] in system_props:
-                    continue
-                formatted_props[prop["name"]] = {
-                    "id": prop["id"],
-                    "key": prop["key"],
-                    "name": prop["name"],
-                    "format": prop["format"],
-                }
-                if prop["format"] in ["select", "multiselect"]:
-                    formatted_props[prop["name"]]["options"] = self.get_tags_from_prop(
-                        space_id, prop["id"]
-                    )
-            return formatted_props
-        return {}
+        props = await schema_cache.get_or_load_async(
+            (space_id, "props"),
+            lambda: make_async_call(
+                "get", prop_url, f"get props from space {space_id}"
+            ),
+        )
+        formatted_props = self._select_props(props, system_props)
+        if options:
+            await self.add_options(space_id, list(formatted_props.values()), fan_out)
+        return formatted_props
+
+    async def add_options(
+        self, space_id: str, prop_dicts: list[dict], fan_out: int | None = None
+    ):
+        """Fetches tags onto formatted select prop dicts, fan_out props at a time"""
+        selects = [p for p in prop_dicts if p["format"] in ["select", "multiselect"]]
+        options = await self._bounded(
+            [partial(self.get_tags_from_prop, space_id, p["id"]) for p in selects],
+            fan_out,
+        )
+        for prop, tags in zip(selects, options):
+            prop["options"] = tags
 
-    def get_tags_from_prop(self, space_id: str, prop_id: str):
+    async def get_tags_from_prop(self, space_id: str, prop_id: str):
         """Returns the tag and name from the provided list"""
         tag_url = URL + space_id
         tag_url += PROPS + prop_id
         tag_url += "/tags"
-        tags = make_call("get", tag_url, "get tags from property")
-        formatted_tags = {}
-        if tags["data"]:
-            for tag in tags["data"]:
-                formatted_tags[tag["name"]] = {
-                    "id": tag["id"],
-                    "key": tag["key"],
-                    "name": tag["name"],
-                    "color": tag["color"],
-                }
-            return formatted_tags
-        return {}
+        tags = await schema_cache.get_or_load_async(
+            (space_id, "tags", prop_id),
+            lambda: make_async_call("get", tag_url, "get tags from property"),
+        )
+        return self._format_tags(tags)
 
-    def add_tag_to_select_property(self, space_id: str, prop_id: str, data: dict):
+    @invalidates("tags")
+    async def add_tag_to_select_property(self, space_id: str, prop_id: str, data: dict):
         """Adds option to provided property"""
         prop_url = URL + space_id
         prop_url += PROPS + prop_id
         prop_url += "/tags"
-        new_tag = make_call(
+        new_tag = await make_async_call(
             "post",
             prop_url,
             f"add {data['name']} to property",
             data,
         )
-        formatted_tag = {}
-        if new_tag["tag"]:
-            formatted_tag[new_tag["tag"]["name"]] = {
-                "id": new_tag["tag"]["id"],
-                "key": new_tag["tag"]["key"],
-                "name": new_tag["tag"]["name"],
-                "color": new_tag["tag"]["color"],
-            }
-        return formatted_tag
+        return self._format_new_tag(new_tag)
 
-    def create_property(self, space_id: str, data: dict):
+    @invalidates("props")
+    async def create_property(self, space_id: str, data: dict):
         """Adds property to space"""
         prop_url = URL + space_id
         prop_url += "/properties"
@@ -313,13 +877,16 @@ class AnyTypeUtils:
             "key": data["key"],
             "name": data["name"],
         }
-        new_prop = make_call(
+        new_prop = await make_async_call(
             "post", prop_url, f"add property '{data['name']}' to space", prop_data
         )
         return new_prop["property"]["id"] if new_prop is not None else None
 
-    def delete_property(self, space_id, prop_dict):
+    @invalidates("props", "tags")
+    async def delete_property(self, space_id, prop_dict):
         """Removes property from space"""
         prop_url = URL + space_id
         prop_url += "/properties/" + prop_dict["id"]
-        prop_url = make_call("delete", prop_url, f'delete property {prop_dict["name"]}')
+        await make_async_call(
+            "delete", prop_url, f'delete property {prop_dict["name"]}'
+        )
@@ -1,7 +1,7 @@
 """API module to for sharing"""
 
-import json
-import random
+from functools import lru_cache
+import asyncio
 import time
 from typing import Optional
 import urllib
@@ -10,13 +10,17 @@ from fastapi import Request, status
 from fastapi.responses import JSONResponse
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
+import httpx
 import requests
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from utils import codec, transport
 from utils.logger import logger
+from utils.metrics import metrics
+from utils.rate_limit import get_bucket, parse_retry_after
+from utils.resilience import RETRY_STATUSES, RetryState
+from utils.single_flight import AsyncSingleFlight
 
-RETRIES: int = 3
-DELAY: int = 2
 TIMEOUT: int = 3
 
 
@@ -47,54 +51,48 @@ class EnvSettings(BaseSettings):
 
 keys = EnvSettings()
 
-RESPONSE_MAP = {
-    "delete": lambda u, h: requests.delete(u, headers=h, timeout=TIMEOUT),
-    "get": lambda u, h: requests.get(u, headers=h, timeout=TIMEOUT),
-    "patch": lambda u, h, d: requests.patch(
-        u,
-        headers=h,
-        timeout=TIMEOUT,
-        json=d if isinstance(d, dict) else None,
-        data=d if isinstance(d, str) else None,
-    ),
-    "post": lambda u, h, d: requests.post(
-        u,
-        headers=h,
-        timeout=TIMEOUT,
-        json=d if isinstance(d, dict) else None,
-        data=d if isinstance(d, str) else None,
-    ),
-    "put": lambda u, h, d: requests.put(
-        u,
-        headers=h,
-        timeout=TIMEOUT,
-        json=d if isinstance(d, dict) else None,
-        data=d if isinstance(d, str) else None,
-    ),
-}
+async_flights = AsyncSingleFlight()
+
+PUSHOVER_URL = "https://api.pushover.net"
+
+
+def anytype_base_url():
+    """Root address of the Anytype API"""
+    return "http://" + keys.anytype_url + ":" + keys.anytype_port
+
+
+@lru_cache
+def default_headers(target: str = "anytype") -> dict:
+    """Headers shared by every call to a target, prebuilt once for its session"""
+    if target == "anytype":
+        return {
+            "Content-Type": "application/json",
+            "Authorization": "Bearer " + keys.anytype_key,
+            "Anytype-Version": "2025-11-08",
+        }
+    if target == "timetagger":
+        if keys.timetagger_key is None:
+            get_timetagger_token()
+        return {
+            "Content-Type": "application/json",
+            "authtoken": keys.timetagger_key,
+        }
+    return {
+        "Content-Type": "application/x-www-form-urlencoded",
+    }
 
 
 def request_builder(url: str, data: dict = None, target: str = "anytype"):
     """Builds request scaffolding for API calls"""
-    headers = {
-        "Content-Type": "application/json",
-    }
-    data_pack = data if data else None
+    headers = default_headers(target)
+    data_pack = None
 
     if target == "anytype":
-        headers["Authorization"] = "Bearer " + keys.anytype_key
-        headers["Anytype-Version"] = "2025-11-08"
-
-        url = "http://" + keys.anytype_url + ":" + keys.anytype_port + url
+        url = anytype_base_url() + url
+        data_pack = codec.dumps(data) if data else None
     elif target == "timetagger":
-        if keys.timetagger_key is None:
-            get_timetagger_token()
-        headers["authtoken"] = keys.timetagger_key
-        data_pack = json.dumps(data)
+        data_pack = codec.dumps(data)
     else:
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-        }
         data["token"] = keys.pushover_key
         data["user"] = keys.pushover_user
 
@@ -103,6 +101,12 @@ def request_builder(url: str, data: dict = None, target: str = "anytype"):
     return url, headers, data_pack
 
 
+async def warm_up_clients(targets: dict[str, str]):
+    """Opens a pooled async connection per target, keyed target to base url"""
+    for target, url in targets.items():
+        await transport.warm_up_async(target, url, default_headers(target), TIMEOUT)
+
+
 def get_timetagger_token():
 
     raise NotImplementedError("Please just collect the api token from the app for now")
@@ -117,66 +121,103 @@ def get_timetagger_token():
 
 def exception_handler(e, result, attempt):
     print(f"RequestException on attempt {attempt}: {e}")
-    message = result.get("message") if result else None
+    try:
+        message = result.json().get("message") if result is not None else None
+    except ValueError:
+        message = None
     if message:
         print(f"json response: {message}")
-    return RETRIES + 1
 
 
-def make_call(
+async def make_async_call(
     category: str,
     url: str,
     info: str,
     data: dict | str | None = None,
     target: str = "anytype",
 ):
-    """Makes web request with retry and some error handling"""
+    """
+    Makes web request with retry and some error handling,
+    identical GETs already in flight share one request and its result
+    """
 
     url, headers, data_pack = request_builder(url, data, target)
+    if category == "get":
+        return await async_flights.do(
+            (target, url),
+            lambda: send_async_call(category, url, info, headers, data_pack, target),
+        )
+    return await send_async_call(category, url, info, headers, data_pack, target)
 
-    attempt = 0
-    while True:
-        try:
-            logger.info(f"Attempt to {info}: {attempt} of {RETRIES}")
-
-            response = (
-                RESPONSE_MAP[category](url, headers, data_pack)
-                if category in ["patch", "post", "put"]
-                else RESPONSE_MAP[category](url, headers)
-            )
-
-            response.raise_for_status()
-            return response.json()
-
-        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
-            wait_time = 60 + random.uniform(0, 5)
-            logger.warning(
-                f"Network issue ({e}). Retrying infinitely... Next try in {wait_time:.1f}s"
-            )
-            time.sleep(wait_time)
-            continue  # Restarts the 'while True' loop immediately
-
-        except requests.exceptions.HTTPError as e:
-            if response.status_code == 429:
-                attempt += 1
-                if attempt <= RETRIES:
-                    logger.warning(
-                        f"429 limit hit. Retry {attempt}/{RETRIES} in {DELAY}s..."
+
+async def send_async_call(
+    category: str,
+    url: str,
+    info: str,
+    headers: dict,
+    data_pack: bytes | str | None,
+    target: str,
+):
+    """Sends a built request through the target's client, limiter and breaker"""
+    client = await transport.get_async_client(target, headers, TIMEOUT)
+    bucket = get_bucket(target)
+
+    retry = RetryState(target, info, category, url)
+    try:
+        while True:
+            retry.check()
+            wait = bucket.reserve()
+            retry.within_deadline(wait)
+            await asyncio.sleep(wait)
+            started = time.perf_counter()
+            response = None
+            try:
+                logger.info(
+                    f"Attempt to {info}: {retry.attempt} of {retry.policy.max_retries}"
+                )
+
+                response = await client.request(
+                    category.upper(), url, content=data_pack
+                )
+                metrics.record_response(
+                    target, category, url, response, time.perf_counter() - started
+                )
+
+                response.raise_for_status()
+                retry.succeeded()
+                bucket.relax()
+                return codec.loads(response.content)
+
+            except (httpx.NetworkError, httpx.TimeoutException) as e:
+                metrics.record_request(
+                    target, category, url, "error", time.perf_counter() - started
+                )
+                await asyncio.sleep(retry.failed(e))
+
+            except httpx.HTTPStatusError as e:
+                if response.status_code in RETRY_STATUSES:
+                    await asyncio.sleep(retry.failed(e))
+                    continue
+
+                if response.status_code == 429:
+                    retry.rate_limited(e)
+                    bucket.throttle(
+                        parse_retry_after(response.headers.get("Retry-After"))
                     )
-                    time.sleep(DELAY)
                     continue
 
-            # If it's not a 429, or we ran out of 429 retries, handle normally
-            attempt = exception_handler(e, response, attempt)
-            if attempt > RETRIES:
+                retry.succeeded()
+                exception_handler(e, response, retry.attempt)
                 raise
 
-        except requests.exceptions.RequestException as e:
-            # Catch-all for other request issues (DNS, etc.)
-            attempt += 1
-            if attempt > RETRIES:
-                raise
-            time.sleep(DELAY)
+            except httpx.HTTPError as e:
+                if response is None:
+                    metrics.record_request(
+                        target, category, url, "error", time.perf_counter() - started
+                    )
+                await asyncio.sleep(retry.failed(e))
+    finally:
+        retry.release()
 
 
 class IPAllowlistMiddleware(BaseHTTPMiddleware):
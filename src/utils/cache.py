@@ -0,0 +1,113 @@
+"""Size bounded TTL caches for data that rarely changes upstream"""
+
+from collections import OrderedDict
+import threading
+import time
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Least recently used cache whose entries expire after a TTL.
+    Keys are tuples starting with the space id so a space can be dropped at once
+    """
+
+    def __init__(self, ttl: float = 300, max_size: int = 256):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, ttl: float, max_size: int):
+        """Applies new limits, a TTL of 0 turns the cache off"""
+        with self._lock:
+            self.ttl = ttl
+            self.max_size = max_size
+            self._entries.clear()
+
+    def get(self, key: tuple, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING or entry[0] < time.monotonic():
+                if entry is not _MISSING:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: tuple, value):
+        if self.ttl <= 0 or value is None:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def get_or_load_async(self, key: tuple, loader):
+        """Returns the cached value or stores what the awaited loader returns"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = await loader()
+            self.set(key, value)
+        return value
+
+    def discard(self, key: tuple):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate(self, space_id: str, *kinds: str):
+        """Drops a space's entries, limited to the given kinds when provided"""
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] == space_id and (not kinds or key[1] in kinds):
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class ObjectCache(TTLCache):
+    """
+    Unpacked objects keyed by (space_id, object_id), each stored with its last
+    modified date so an older copy never replaces a newer one
+    """
+
+    def get_object(self, space_id: str, object_id: str, modified: str | None = None):
+        """
+        A copy of the cached object, None when missing or stale. Given the
+        modified date a listing shows, a copy of another date is dropped
+        """
+        entry = self.get((space_id, object_id))
+        if entry is None:
+            return None
+        if modified is not None and entry[0] != modified:
+            self.discard((space_id, object_id))
+            return None
+        return dict(entry[1])
+
+    def put(self, space_id: str, obj: dict, modified: str | None):
+        key = (space_id, obj["id"])
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and modified and (entry[1][0] or "") > modified:
+            return
+        self.set(key, (modified, dict(obj)))
+
+
+schema_cache = TTLCache()
+object_cache = ObjectCache(ttl=60, max_size=4096)
@@ -2,12 +2,15 @@ import re
 from typing import Optional
 
 import calendar
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from dateutil.relativedelta import relativedelta
 
 DATETIME_FORMAT = r"%Y-%m-%dT%H:%M:%SZ"
 
 PATTERN = r"(\d+)-(day|week(?:day|end)?|month|quarter|year)(.+)?"
+RATE = re.compile(PATTERN)
 
 CONVERTER = {
     "mon": 0,
@@ -39,13 +42,28 @@ def get_today(replace=[0, 0], string: bool = False):
     return now
 
 
+def parse_api_date(date_str: str) -> datetime:
+    """Aware datetime of an API date string, dates without an offset read as UTC"""
+    moment = datetime.fromisoformat(date_str)
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+def format_api_date(moment: datetime) -> str:
+    """API date string of an aware datetime, in UTC"""
+    return moment.astimezone(timezone.utc).strftime(DATETIME_FORMAT)
+
+
 def date_eligibility(unit, modifier=None):
     """Returns list of eligible values for days of the week"""
 
-    if unit in ["day", "week", "month", "quarter", "year"]:
+    if unit == "week" and modifier:
+        if isinstance(modifier, str):
+            modifier = modifier.split(",")
+        allowed = sorted({CONVERTER[d] for d in modifier})
+    elif unit in ["day", "week", "month", "quarter", "year"]:
         allowed = [0, 1, 2, 3, 4, 5, 6]
-    elif unit == "week" and modifier:
-        allowed = [CONVERTER[d] for d in modifier.split(",")]
     elif unit == "weekday":
         allowed = [0, 1, 2, 3, 4]
     elif unit == "weekend":
@@ -81,17 +99,18 @@ def validate_modifiers(unit, extra):
             if mod not in CONVERTER:
                 raise ValueError(
                     "Week modifier must be a comma separated list from list of: "
-                    + CONVERTER.keys()
+                    + ", ".join(CONVERTER)
                 )
         return mods
     if unit == "month":
         extra_int = int(extra)
-        if -30 >= extra_int >= 30:
+        if extra_int == 0 or not -31 <= extra_int <= 31:
             raise ValueError(
                 "Month modifier must be within a length of a month. "
                 "If you need last day of the month, try '-1'"
             )
-    return extra_int
+        return extra_int
+    raise ValueError(f"Only week and month rates take a modifier, not {unit}")
 
 
 def unpack_extra(extra_str: str, unit: str):
@@ -111,36 +130,123 @@ def unpack_extra(extra_str: str, unit: str):
     return modifiers, hour, minute
 
 
-def process_due_datetime(number, unit, extra):
+@dataclass(frozen=True)
+class RateRule:
+    """
+    A rate, n-unit:modifier@time, parsed once.
+    Next dates come from calendar arithmetic rather than stepping day by day.
+    A week rate listing days, 2-week:fri, is due on the next listed day left
+    in the current week, else on the first listed day number weeks on.
+    Completed on a Thursday, 2-week:fri is due the next day, then every
+    other Friday. A negative month day counts back from the end of the
+    target month, -1 being its last day
+    """
 
+    number: int
+    unit: str
+    weekdays: tuple[int, ...]
+    listed: bool = False
+    month_day: Optional[int] = None
     hour: int = 0
     minute: int = 0
-    modifier: Optional[int | list[str]] = None
 
+    def next_after(self, dt: datetime) -> datetime:
+        """First due date the rule gives after dt"""
+        if self.month_day is not None:
+            dt_next = dt + relativedelta(months=self.number)
+            day = self.month_day
+            if day < 0:
+                day += calendar.monthrange(dt_next.year, dt_next.month)[1] + 1
+            dt_next += relativedelta(day=day)
+        elif self.listed:
+            dt_next = self._next_listed_day(dt)
+        else:
+            dt_next = DELTA_MAP.get(self.unit, DELTA_MAP["day"])(dt, self.number)
+            weekday = dt_next.weekday()
+            dt_next += timedelta(days=min((d - weekday) % 7 for d in self.weekdays))
+
+        return dt_next.replace(
+            hour=self.hour, minute=self.minute, second=0, microsecond=0
+        )
+
+    def next_n(self, dt: datetime, n: int) -> list[datetime]:
+        """The next n due dates after dt"""
+        dates = []
+        for _ in range(n):
+            dt = self.next_after(dt)
+            dates.append(dt)
+        return dates
+
+    def _next_listed_day(self, dt: datetime) -> datetime:
+        """
+        Next listed weekday later in dt's week, else the first listed weekday
+        of the week number weeks on
+        """
+        weekday = dt.weekday()
+        for day in self.weekdays:
+            if day > weekday:
+                return dt + timedelta(days=day - weekday)
+        return dt + timedelta(weeks=self.number, days=self.weekdays[0] - weekday)
+
+
+@lru_cache(maxsize=1024)
+def compile_rate(rate_str: str) -> RateRule:
+    """Parses a rate string into its rule, each distinct string is parsed once"""
+    match = RATE.search(rate_str)
+    if match is None:
+        raise ValueError(f"Rate not in acceptable format: {rate_str}")
+    number, unit, extra = match.groups()
+
+    modifier, hour, minute = None, 0, 0
     if extra is not None:
         modifier, hour, minute = unpack_extra(extra, unit)
 
     if unit == "month" and modifier:
-        dt_now = datetime.now()
-        if modifier < 0:
-            _, last_day_num = calendar.monthrange(dt_now.year, dt_now.month)
-            modifier = modifier + last_day_num
-        dt_next: datetime = dt_now + relativedelta(months=number, day=modifier)
-
-    else:
-        dt_next: datetime = DELTA_MAP.get(unit, lambda d, n: d + relativedelta(days=n))(
-            datetime.now(),
-            number,
+        return RateRule(
+            int(number), unit, (), month_day=modifier, hour=hour, minute=minute
         )
+    return RateRule(
+        int(number),
+        unit,
+        tuple(date_eligibility(unit, modifier)),
+        listed=unit == "week" and bool(modifier),
+        hour=hour,
+        minute=minute,
+    )
 
-        allowed = date_eligibility(unit, modifier)
 
-        while dt_next.weekday() not in allowed:
-            dt_next += relativedelta(days=1)
+def next_due_date(task: dict, after: datetime) -> Optional[str]:
+    """
+    Next due date string of a task after the given reading of the clock,
+    None for tasks without a Rate. Raises AttributeError for a malformed Rate
+    """
+    rate = task.get("Rate")
+    if rate in ["", None]:
+        return None
+    return _rule(rate, task["name"]).next_after(after).strftime(DATETIME_FORMAT)
 
-    dt_next = dt_next.replace(hour=hour, minute=minute, second=0, microsecond=0)
 
-    return dt_next
+def next_due_dates(
+    tasks: list[dict], after: datetime
+) -> dict[str, Optional[str] | AttributeError]:
+    """
+    Next due dates of many tasks at one reading of the clock, keyed by id.
+    A malformed Rate maps to its AttributeError rather than aborting the batch
+    """
+    dates = {}
+    for task in tasks:
+        try:
+            dates[task["id"]] = next_due_date(task, after)
+        except AttributeError as exc:
+            dates[task["id"]] = exc
+    return dates
+
+
+def _rule(rate_str: str, task_name: str) -> RateRule:
+    try:
+        return compile_rate(rate_str)
+    except ValueError as exc:
+        raise AttributeError(f"{exc}. Please review {task_name}") from exc
 
 
 def get_next_date(rate_str: str, task_name: str = ""):
@@ -152,16 +258,6 @@ def get_next_date(rate_str: str, task_name: str = ""):
     day of the month - 1-month:15
     """
 
-    try:
-        captured = re.search(PATTERN, rate_str).groups()
-    except AttributeError as exc:
-        raise AttributeError(
-            "Rate not in acceptable format. Please review " + task_name
-        ) from exc
-    number: int = int(captured[0])
-    unit: str = captured[1]
-    extra: [str] = captured[2] if captured[2] else None
-
-    dt_next = process_due_datetime(number, unit, extra)
+    dt_next = _rule(rate_str, task_name).next_after(datetime.now())
 
     return dt_next.strftime(DATETIME_FORMAT)
@@ -0,0 +1,127 @@
+"""Schema compiled decoding of API objects into compact records for bulk jobs"""
+
+from typing import Iterable
+
+# Props the API adds to every object, absent from scanned space data
+SYSTEM_PROPS = {
+    "Creation date": ("created_date", "date"),
+    "Last modified date": ("last_modified_date", "date"),
+}
+
+PLAIN_FORMATS = frozenset(("checkbox", "date", "number", "text", "url"))
+
+
+def read_select(prop: dict):
+    tag = prop.get("select")
+    return tag["name"] if tag else None
+
+
+def read_multiselect(prop: dict):
+    return [tag["name"] for tag in prop.get("multiselect") or []]
+
+
+def reader(fmt: str):
+    """Value reader of a property format, formats unpack_object skips read None"""
+    if fmt in PLAIN_FORMATS:
+        return lambda prop: prop.get(fmt)
+    if fmt == "select":
+        return read_select
+    if fmt == "multiselect":
+        return read_multiselect
+    return lambda prop: None
+
+
+class ObjectRecord:
+    """
+    Object holding only the fields a job asked for, read like the dict
+    unpack_object returns. Fields the object lacks are unset slots,
+    reading a field the job did not ask for raises KeyError
+    """
+
+    __slots__ = ("name", "id", "type")
+    _attrs: dict[str, str] = {"name": "name", "id": "id", "type": "type"}
+
+    def __getitem__(self, field: str):
+        try:
+            return getattr(self, self._attrs[field])
+        except AttributeError:
+            raise KeyError(field) from None
+
+    def __setitem__(self, field: str, value):
+        setattr(self, self._attrs[field], value)
+
+    def __contains__(self, field) -> bool:
+        attr = self._attrs.get(field)
+        return attr is not None and hasattr(self, attr)
+
+    def get(self, field: str, default=None):
+        attr = self._attrs.get(field)
+        if attr is None:
+            raise KeyError(f"{field} was not asked of the decoder")
+        return getattr(self, attr, default)
+
+    def keys(self) -> list[str]:
+        return [field for field in self._attrs if field in self]
+
+    def items(self):
+        return [(field, self[field]) for field in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())})"
+
+
+class ObjectDecoder:
+    """
+    Compiled from a space's props for the fields a job needs,
+    every other property of the object is skipped
+    """
+
+    def __init__(self, props: dict, fields: Iterable[str]):
+        fields = [
+            field for field in dict.fromkeys(fields) if field not in ObjectRecord._attrs
+        ]
+        attrs = {field: f"_{index}" for index, field in enumerate(fields)}
+        self.record = type(
+            "ObjectRecord",
+            (ObjectRecord,),
+            {
+                "__slots__": tuple(attrs.values()),
+                "_attrs": {**ObjectRecord._attrs, **attrs},
+            },
+        )
+        # Prop key to the slot's setter and the value reader
+        self.readers: dict[str, tuple] = {}
+        for field in fields:
+            setter = getattr(self.record, attrs[field]).__set__
+            prop = props.get(field)
+            if prop is not None:
+                self.readers[prop.key] = (setter, reader(prop.format))
+            elif field in SYSTEM_PROPS:
+                key, fmt = SYSTEM_PROPS[field]
+                self.readers[key] = (setter, reader(fmt))
+
+    def decode(self, raw: dict) -> ObjectRecord:
+        record = self.record()
+        record.name = raw["name"]
+        record.id = raw["id"]
+        record.type = raw["type"]["name"]
+        readers = self.readers
+        for prop in raw["properties"]:
+            spec = readers.get(prop["key"])
+            if spec is not None:
+                spec[0](record, spec[1](prop))
+        return record
+
+    def from_dict(self, obj) -> ObjectRecord:
+        """Record of an object unpack_object already read"""
+        record = self.record()
+        for field, attr in self.record._attrs.items():
+            if field in obj:
+                setattr(record, attr, obj[field])
+        return record
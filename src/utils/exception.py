@@ -2,3 +2,7 @@ class AnytypeException(Exception):
     def __init__(self, status: int, message: str):
         self.status = status
         self.message = message
+
+
+class UpstreamUnavailableException(AnytypeException):
+    """Raised when an upstream circuit is open or a call runs past its deadline"""
@@ -0,0 +1,151 @@
+"""Run guards and run history shared by scheduled jobs and their manual endpoints"""
+
+import asyncio
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+import os
+import time
+
+from models.job_models import JobRun
+from utils import codec
+from utils.exception import AnytypeException
+from utils.logger import logger
+from utils.metrics import counting_calls
+
+# Characters of a run's return value kept in its history entry
+RESULT_LIMIT = 500
+
+_current: ContextVar[JobRun | None] = ContextVar("job_run", default=None)
+
+
+def note_phase(name: str, seconds: float):
+    """Adds a phase duration to the running job, a no-op outside of a job"""
+    run = _current.get()
+    if run is not None:
+        run.phases[name] = round(run.phases.get(name, 0.0) + seconds, 4)
+
+
+def note_objects(**counts: int):
+    """Adds object counts to the running job, a no-op outside of a job"""
+    run = _current.get()
+    if run is not None:
+        for key, count in counts.items():
+            if count:
+                run.objects[key] = run.objects.get(key, 0) + count
+
+
+def note_error(message: str):
+    """Adds an error the running job recovered from, a no-op outside of a job"""
+    run = _current.get()
+    if run is not None:
+        run.errors.append(message)
+
+
+class JobHistory:
+    """
+    Bounded ring buffer of finished runs, newest last.
+    With a path the buffer is written on every run and read back at start up
+    """
+
+    def __init__(self, size: int = 100):
+        self.runs: deque[JobRun] = deque(maxlen=size)
+        self.path = ""
+
+    def configure(self, size: int, path: str = ""):
+        self.runs = deque(self.runs, maxlen=max(size, 1))
+        self.path = path
+        if path and os.path.exists(path):
+            try:
+                with open(path, "rb") as file:
+                    saved = codec.loads(file.read())
+                self.runs.extend(JobRun(**run) for run in saved)
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"Could not load job history from {path}: {e}")
+
+    def add(self, run: JobRun):
+        self.runs.append(run)
+        if self.path:
+            try:
+                with open(self.path, "wb") as file:
+                    file.write(codec.dumps(list(self.runs)))
+            except OSError as e:
+                logger.warning(f"Could not save job history to {self.path}: {e}")
+
+    def list(self, job: str | None = None, limit: int | None = None) -> list[JobRun]:
+        """Runs newest first, optionally of one job only"""
+        runs = [run for run in reversed(self.runs) if job in (None, run.job)]
+        return runs[:limit] if limit else runs
+
+    async def record(self, name: str, trigger: str, job, *args, **kwargs):
+        """Runs the job and adds its timing, calls, counts and errors to the buffer"""
+        run = JobRun(
+            job=name,
+            trigger=trigger,
+            started=datetime.now().isoformat(timespec="seconds"),
+        )
+        token = _current.set(run)
+        start = time.perf_counter()
+        try:
+            with counting_calls() as calls:
+                result = await job(*args, **kwargs)
+            if result is not None:
+                run.result = str(result)[:RESULT_LIMIT]
+            return result
+        except Exception as e:
+            run.errors.append(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current.reset(token)
+            run.seconds = round(time.perf_counter() - start, 4)
+            run.ended = datetime.now().isoformat(timespec="seconds")
+            run.calls = dict(calls)
+            self.add(run)
+
+
+job_history = JobHistory()
+
+
+class JobLocks:
+    """
+    One asyncio lock per job name so a job never overlaps itself,
+    whether a run comes from the scheduler or from an endpoint
+    """
+
+    def __init__(self, history: JobHistory = job_history):
+        self._locks: dict[str, asyncio.Lock] = {}
+        self.history = history
+
+    def lock(self, name: str) -> asyncio.Lock:
+        return self._locks.setdefault(name, asyncio.Lock())
+
+    def running(self) -> list[str]:
+        return [name for name, lock in self._locks.items() if lock.locked()]
+
+    def guard(self, name: str, job):
+        """Scheduler wrapper, a run arriving while the job is busy is skipped"""
+
+        @wraps(job)
+        async def guarded(*args, **kwargs):
+            lock = self.lock(name)
+            if lock.locked():
+                logger.warning(f"{name} is still running, skipping this run")
+                return None
+            async with lock:
+                return await self.history.record(
+                    name, "scheduled", job, *args, **kwargs
+                )
+
+        return guarded
+
+    async def run(self, name: str, job, *args, **kwargs):
+        """Endpoint runner, a call arriving while the job is busy is refused"""
+        lock = self.lock(name)
+        if lock.locked():
+            raise AnytypeException(409, f"{name} is already running")
+        async with lock:
+            return await self.history.record(name, "manual", job, *args, **kwargs)
+
+
+job_locks = JobLocks()
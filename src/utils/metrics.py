@@ -0,0 +1,201 @@
+"""Upstream call metrics, rendered in the Prometheus text format"""
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+import threading
+from urllib.parse import urlsplit
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Attempts of the running block by target and method, see counting_calls
+_call_counts: ContextVar[Counter | None] = ContextVar("call_counts", default=None)
+
+# Path segments whose next segment is an id
+COLLECTIONS = {
+    "spaces",
+    "objects",
+    "types",
+    "templates",
+    "lists",
+    "views",
+    "properties",
+    "tags",
+    "members",
+}
+
+
+@lru_cache(maxsize=1024)
+def route_template(url: str) -> str:
+    """Normalises a url to its route, ids swapped for {id} and the query dropped"""
+    segments = urlsplit(url).path.split("/")
+    for index in range(1, len(segments)):
+        if segments[index - 1] in COLLECTIONS and segments[index]:
+            segments[index] = "{id}"
+    return "/".join(segments) or "/"
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+
+
+class UpstreamMetrics:
+    """Latency, status, retry and byte counts per target and route"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: dict[tuple, _Histogram] = {}
+        self.responses: dict[tuple, int] = {}
+        self.retries: dict[tuple, int] = {}
+        self.sent: dict[tuple, int] = {}
+        self.received: dict[tuple, int] = {}
+
+    def record_request(
+        self,
+        target: str,
+        method: str,
+        url: str,
+        status: int | str,
+        seconds: float,
+        sent: int = 0,
+        received: int = 0,
+    ):
+        """Records a single attempt against the upstream"""
+        route = route_template(url)
+        key = (target, method.upper(), route)
+        counts = _call_counts.get()
+        if counts is not None:
+            counts[f"{target} {method.upper()}"] += 1
+        with self._lock:
+            self.latency.setdefault(key, _Histogram()).observe(seconds)
+            status_key = key + (str(status),)
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+            self.sent[key] = self.sent.get(key, 0) + sent
+            self.received[key] = self.received.get(key, 0) + received
+
+    def record_response(
+        self, target: str, method: str, url: str, response, seconds: float
+    ):
+        """Records an attempt that got a response, requests or httpx"""
+        request = response.request
+        body = request.body if hasattr(request, "body") else request.content
+        self.record_request(
+            target,
+            method,
+            url,
+            response.status_code,
+            seconds,
+            len(body) if body else 0,
+            len(response.content),
+        )
+
+    def record_retry(self, target: str, method: str, url: str, reason: str):
+        """Records an attempt that will be retried and why"""
+        key = (target, method.upper(), route_template(url), reason)
+        with self._lock:
+            self.retries[key] = self.retries.get(key, 0) + 1
+
+    def render(self) -> str:
+        """Prometheus text exposition of every metric"""
+        labels = ("target", "method", "route")
+        lines = []
+        with self._lock:
+            lines += _header(
+                "upstream_request_duration_seconds",
+                "histogram",
+                "Upstream request latency per attempt",
+            )
+            for key, histogram in sorted(self.latency.items()):
+                base = _labels(labels, key)
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    lines.append(
+                        "upstream_request_duration_seconds_bucket"
+                        f'{{{base},le="{bound}"}} {count}'
+                    )
+                lines.append(
+                    "upstream_request_duration_seconds_bucket"
+                    f'{{{base},le="+Inf"}} {histogram.total}'
+                )
+                lines.append(
+                    "upstream_request_duration_seconds_sum"
+                    f"{{{base}}} {histogram.sum}"
+                )
+                lines.append(
+                    "upstream_request_duration_seconds_count"
+                    f"{{{base}}} {histogram.total}"
+                )
+
+            lines += _counter(
+                "upstream_responses_total",
+                "Upstream attempts by status code, error for network failures",
+                labels + ("status",),
+                self.responses,
+            )
+            lines += _counter(
+                "upstream_retries_total",
+                "Upstream attempts that were retried, by reason",
+                labels + ("reason",),
+                self.retries,
+            )
+            lines += _counter(
+                "upstream_request_bytes_total",
+                "Request body bytes sent upstream",
+                labels,
+                self.sent,
+            )
+            lines += _counter(
+                "upstream_response_bytes_total",
+                "Response body bytes received from upstream",
+                labels,
+                self.received,
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _header(name: str, kind: str, description: str):
+    return [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    return ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _counter(name: str, description: str, labels: tuple, values: dict):
+    lines = _header(name, "counter", description)
+    for key, value in sorted(values.items()):
+        lines.append(f"{name}{{{_labels(labels, key)}}} {value}")
+    return lines
+
+
+@contextmanager
+def counting_calls():
+    """
+    Counts the upstream attempts made inside the block and the tasks it starts,
+    keyed by target and method
+    """
+    counts = Counter()
+    token = _call_counts.set(counts)
+    try:
+        yield counts
+    finally:
+        _call_counts.reset(token)
+
+
+metrics = UpstreamMetrics()
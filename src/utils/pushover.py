@@ -1,18 +1,20 @@
 """Pushover utilities for sending notifications."""
 
-from utils.api_tools import make_call
+from utils.api_tools import PUSHOVER_URL, make_async_call
 
 
 class PushoverUtils:
     """Class to handle Pushover notifications."""
 
     def __init__(self):
-        self.url = "https://api.pushover.net/1/messages.json"
+        self.url = PUSHOVER_URL + "/1/messages.json"
         self.data = {
             "html": 1,
         }
 
-    def send_message(self, title: str, message: str, priority: int = 0, timestamp=None):
+    async def send_message(
+        self, title: str, message: str, priority: int = 0, timestamp=None
+    ):
         """Send a message via Pushover."""
         data = self.data.copy()
         data["title"] = title
@@ -26,7 +28,7 @@ class PushoverUtils:
         if timestamp is not None:
             data["timestamp"] = timestamp
         # fmt: off
-        make_call(
+        await make_async_call(
             "post",
             self.url,
             "send message via pushover",
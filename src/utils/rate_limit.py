@@ -0,0 +1,140 @@
+"""Adaptive token bucket per upstream, shared by every call to it"""
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import threading
+import time
+
+from utils.logger import logger
+from utils.transport import upstream_config
+
+
+class TokenBucket:
+    """
+    Hands out send slots, unlimited until the target answers 429,
+    then cuts the rate on each 429 and adds it back step by step on success
+    """
+
+    def __init__(self, target: str):
+        self.target = target
+        config = upstream_config(target).rate_limit
+        # None while unlimited
+        self.rate = config.rate
+        self.peak = config.rate
+        self.tokens = float(config.burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.window_start = self.updated
+        self.window_sent = 0
+        self.sent_rate = 0.0
+        self._lock = threading.Lock()
+
+    def _count_send(self, now: float):
+        """Tracks the send rate in one second windows while unlimited"""
+        elapsed = now - self.window_start
+        if elapsed >= 1.0:
+            self.sent_rate = self.window_sent / elapsed
+            self.window_start = now
+            self.window_sent = 0
+        self.window_sent += 1
+
+    def reserve(self) -> float:
+        """Takes a token, returns the seconds to wait before sending"""
+        config = upstream_config(self.target).rate_limit
+        with self._lock:
+            now = time.monotonic()
+            blocked = self.blocked_until - now
+            if self.rate is None:
+                self._count_send(now)
+                return max(blocked, 0.0)
+            self.tokens = min(
+                float(config.burst), self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, blocked)
+
+    def throttle(self, retry_after: float | None = None):
+        """Lowers the rate after a 429, honouring Retry-After when sent"""
+        config = upstream_config(self.target).rate_limit
+        with self._lock:
+            now = time.monotonic()
+            if self.rate is None:
+                # Start limiting from the rate that drew the 429
+                sending = self.window_sent / max(now - self.window_start, 1.0)
+                self.peak = max(self.sent_rate, sending, config.min_rate)
+                self.rate = self.peak
+                self.tokens = 0.0
+                self.updated = now
+            self.rate = max(config.min_rate, self.rate * config.decrease_factor)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            logger.warning(
+                f"429 from {self.target}, rate lowered to {self.rate:.2f}/s"
+                + (f", paused {retry_after:.1f}s" if retry_after else "")
+            )
+
+    def relax(self):
+        """
+        Regains some rate after a successful call, up to max_rate when set.
+        Otherwise up to the starting rate, or the rate that drew the first 429
+        when it started unlimited, at which point the bucket is lifted again
+        """
+        config = upstream_config(self.target).rate_limit
+        with self._lock:
+            if self.rate is None:
+                return
+            ceiling = config.max_rate or self.peak
+            self.rate += config.recovery_step
+            if self.rate < ceiling:
+                return
+            if config.max_rate is None and config.rate is None:
+                logger.info(f"Rate limit for {self.target} lifted")
+                self.rate = None
+                self.window_start = time.monotonic()
+                self.window_sent = 0
+            else:
+                self.rate = ceiling
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            if self.rate is None:
+                return {"rate": "unlimited"}
+            return {"rate": round(self.rate, 2), "tokens": round(self.tokens, 2)}
+
+
+_buckets: dict[str, TokenBucket] = {}
+_lock = threading.Lock()
+
+
+def get_bucket(target: str) -> TokenBucket:
+    """Returns the shared bucket for a target"""
+    with _lock:
+        if target not in _buckets:
+            _buckets[target] = TokenBucket(target)
+        return _buckets[target]
+
+
+def bucket_states() -> dict:
+    """Current rate of every bucket that has seen a call"""
+    with _lock:
+        buckets = list(_buckets.values())
+    return {bucket.target: bucket.snapshot() for bucket in buckets}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header, either seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
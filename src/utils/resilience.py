@@ -0,0 +1,184 @@
+"""Circuit breakers and retry bookkeeping shared by every call to an upstream"""
+
+import threading
+import time
+
+from utils.exception import UpstreamUnavailableException
+from utils.logger import logger
+from utils.metrics import metrics
+from utils.transport import upstream_config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast after a run of consecutive failures,
+    lets a single probe through once the reset window passes
+    """
+
+    def __init__(self, target: str):
+        self.target = target
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def check(self) -> bool:
+        """
+        Raises if the circuit is open, moves to half open after the reset window,
+        returns True when the caller holds the single half open probe
+        """
+        policy = upstream_config(self.target).retry
+        with self._lock:
+            if self.state == CLOSED:
+                return False
+            waited = time.monotonic() - self.opened_at
+            if self.state == OPEN and waited >= policy.breaker_reset:
+                logger.info(f"Circuit for {self.target} half open, probing")
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            raise UpstreamUnavailableException(
+                503,
+                f"Circuit open for {self.target}, "
+                f"retry in {max(policy.breaker_reset - waited, 0):.1f}s",
+            )
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"Circuit for {self.target} closed")
+            self.state = CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def record_failure(self):
+        threshold = upstream_config(self.target).retry.breaker_threshold
+        with self._lock:
+            self.failures += 1
+            self.probing = False
+            if self.state == HALF_OPEN or self.failures >= threshold:
+                if self.state != OPEN:
+                    logger.warning(
+                        f"Circuit for {self.target} open after {self.failures} failures"
+                    )
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def abandon_probe(self):
+        """Frees the probe slot of a call that ended without a verdict"""
+        with self._lock:
+            self.probing = False
+
+    def snapshot(self) -> dict:
+        """Current state for the breaker endpoint"""
+        with self._lock:
+            data = {"state": self.state, "consecutive_failures": self.failures}
+            if self.state != CLOSED:
+                data["open_for"] = round(time.monotonic() - self.opened_at, 1)
+            return data
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_lock = threading.Lock()
+
+
+def get_breaker(target: str) -> CircuitBreaker:
+    """Returns the shared breaker for a target"""
+    with _lock:
+        if target not in _breakers:
+            _breakers[target] = CircuitBreaker(target)
+        return _breakers[target]
+
+
+def breaker_states() -> dict:
+    """State of every breaker that has seen a call"""
+    with _lock:
+        breakers = list(_breakers.values())
+    return {breaker.target: breaker.snapshot() for breaker in breakers}
+
+
+class RetryState:
+    """Tracks the attempts of one call against its target's retry policy"""
+
+    def __init__(self, target: str, info: str, method: str = "", url: str = ""):
+        self.target = target
+        self.info = info
+        self.method = method
+        self.url = url
+        self.policy = upstream_config(target).retry
+        self.breaker = get_breaker(target)
+        self.deadline = time.monotonic() + self.policy.deadline
+        self.attempt = 0
+        self.limited = 0
+        self.probe = False
+
+    def check(self):
+        """Fails fast when the circuit is open"""
+        self.probe = self.breaker.check()
+
+    def release(self):
+        """
+        Called once the call is over, a probe still held here was cut short
+        by a deadline, cancellation or unexpected error and is handed back
+        """
+        if self.probe:
+            self.probe = False
+            self.breaker.abandon_probe()
+
+    def succeeded(self):
+        self.probe = False
+        self.breaker.record_success()
+
+    def rate_limited(self, error: Exception):
+        """Counts a 429, the upstream is alive so the breaker sees a success"""
+        self.succeeded()
+        self.limited += 1
+        if self.limited > self.policy.max_retries:
+            raise UpstreamUnavailableException(
+                429,
+                f"Unable to {self.info}, rate limited {self.limited} times: {error}",
+            ) from error
+        metrics.record_retry(self.target, self.method, self.url, "rate_limited")
+
+    def within_deadline(self, wait: float):
+        """Raises when waiting would run the call past its deadline"""
+        if time.monotonic() + wait > self.deadline:
+            raise UpstreamUnavailableException(
+                504,
+                f"Unable to {self.info} within {self.policy.deadline:.0f}s, "
+                f"rate limit wait of {wait:.1f}s",
+            )
+
+    def failed(self, error: Exception) -> float:
+        """Records an upstream failure, returns the wait before the next attempt"""
+        self.probe = False
+        self.breaker.record_failure()
+        self.attempt += 1
+        if self.attempt > self.policy.max_retries:
+            raise UpstreamUnavailableException(
+                503,
+                f"Unable to {self.info} after {self.attempt} attempts: {error}",
+            ) from error
+
+        wait = self.policy.backoff(self.attempt)
+        if time.monotonic() + wait > self.deadline:
+            raise UpstreamUnavailableException(
+                504,
+                f"Unable to {self.info} within {self.policy.deadline:.0f}s: {error}",
+            ) from error
+
+        metrics.record_retry(self.target, self.method, self.url, type(error).__name__)
+        logger.warning(
+            f"Upstream issue ({error}). "
+            f"Retry {self.attempt}/{self.policy.max_retries} in {wait:.1f}s"
+        )
+        return wait
@@ -0,0 +1,52 @@
+"""
+Coalesces identical in-flight calls so concurrent callers share one request,
+and serializes calls that must not overlap on the same key
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class AsyncSingleFlight:
+    """
+    The first caller for a key runs the call, callers arriving while it runs
+    share the leader's task and its result, callers must not mutate it.
+    Cancelling a waiter does not cancel the shared request
+    """
+
+    def __init__(self):
+        self._calls: dict[tuple, asyncio.Task] = {}
+
+    async def do(self, key: tuple, fn):
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: tuple, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+
+class AsyncKeyedLock:
+    """
+    One event loop lock per key, dropped once nobody holds or waits on it.
+    Callers holding the same key run one after the other
+    """
+
+    def __init__(self):
+        self._locks: dict[tuple, list] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: tuple):
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
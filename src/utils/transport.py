@@ -0,0 +1,92 @@
+"""Pooled keep-alive async clients, one per upstream target"""
+
+import asyncio
+import threading
+
+import httpx
+
+from models.upstream_models import UpstreamConfig
+from utils.logger import logger
+
+TARGETS = ("anytype", "timetagger", "pushover")
+
+_configs: dict[str, UpstreamConfig] = {}
+# target -> (loop, client, configuration generation it was built for)
+_async_clients: dict[str, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient, int]] = {}
+_generation = 0
+_lock = threading.Lock()
+
+
+def upstream_config(target: str) -> UpstreamConfig:
+    """Returns the configuration for a target, defaults if none was provided"""
+    return _configs.get(target) or UpstreamConfig()
+
+
+def configure_sessions(configs: dict[str, UpstreamConfig]):
+    """
+    Replaces the upstream configuration, existing clients are closed
+    and rebuilt on next use
+    """
+    global _generation
+    with _lock:
+        _configs.clear()
+        _configs.update(configs or {})
+        _generation += 1
+
+
+async def _close_client(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient):
+    """Closes a client on the loop it was opened on"""
+    if loop is asyncio.get_running_loop():
+        await client.aclose()
+    elif loop.is_running():
+        await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        )
+    # A closed loop already took the client's connections with it
+
+
+async def get_async_client(
+    target: str, headers: dict, timeout: float
+) -> httpx.AsyncClient:
+    """
+    Returns the pooled async client for a target, bound to the running loop.
+    A client of another loop or an older configuration is replaced and closed
+    """
+    loop = asyncio.get_running_loop()
+    bound = _async_clients.get(target)
+    if bound is not None and bound[0] is loop and bound[2] == _generation:
+        return bound[1]
+
+    config = upstream_config(target)
+    client = httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=config.pool_size if config.pool_block else None,
+            max_keepalive_connections=config.pool_size,
+        ),
+    )
+    _async_clients[target] = (loop, client, _generation)
+    logger.info(f"Opened {target} async client with pool size {config.pool_size}")
+    if bound is not None:
+        await _close_client(bound[0], bound[1])
+    return client
+
+
+async def warm_up_async(target: str, url: str, headers: dict, timeout: float):
+    """Opens a pooled connection so the first real call skips the handshake"""
+    if not upstream_config(target).warm_up:
+        return
+    try:
+        client = await get_async_client(target, headers, timeout)
+        await client.head(url)
+        logger.info(f"Warmed up {target} async connection")
+    except httpx.HTTPError as e:
+        logger.warning(f"Unable to warm up {target} async connection: {e}")
+
+
+async def close_async_clients():
+    """Closes every pooled async client, used on shutdown"""
+    for target, (loop, client, _) in list(_async_clients.items()):
+        del _async_clients[target]
+        await _close_client(loop, client)
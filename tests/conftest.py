@@ -0,0 +1,4 @@
+import os
+
+# api_tools reads its settings on import
+os.environ.setdefault("ANYTYPE_KEY", "test")
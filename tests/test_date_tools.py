@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import pytest
+
+from utils.date_tools import (
+    DATETIME_FORMAT,
+    compile_rate,
+    next_due_date,
+    next_due_dates,
+)
+
+# A Thursday
+AFTER = datetime(2026, 1, 15, 9, 30)
+
+
+def due(rate: str, count: int = 1) -> list[str]:
+    dates = compile_rate(rate).next_n(AFTER, count)
+    return [date.strftime(DATETIME_FORMAT) for date in dates]
+
+
+# Outputs of the get_next_date that stepped day by day, before rules were compiled
+@pytest.mark.parametrize(
+    "rate, expected",
+    [
+        ("1-day", "2026-01-16T00:00:00Z"),
+        ("3-day@14", "2026-01-18T14:00:00Z"),
+        ("1-day@0930", "2026-01-16T09:30:00Z"),
+        ("1-week", "2026-01-22T00:00:00Z"),
+        ("2-week@8", "2026-01-29T08:00:00Z"),
+        ("1-weekday", "2026-01-16T00:00:00Z"),
+        ("5-weekday", "2026-01-20T00:00:00Z"),
+        ("1-weekend", "2026-01-17T00:00:00Z"),
+        ("1-month", "2026-02-15T00:00:00Z"),
+        ("1-month:15", "2026-02-15T00:00:00Z"),
+        ("1-month:31", "2026-02-28T00:00:00Z"),
+        ("1-quarter", "2026-04-15T00:00:00Z"),
+        ("1-year@23", "2027-01-15T23:00:00Z"),
+    ],
+)
+def test_matches_stepped_dates(rate, expected):
+    assert due(rate) == [expected]
+
+
+def test_listed_week_day_later_this_week():
+    assert due("2-week:fri", 3) == [
+        "2026-01-16T00:00:00Z",
+        "2026-01-30T00:00:00Z",
+        "2026-02-13T00:00:00Z",
+    ]
+
+
+def test_listed_week_days():
+    assert due("1-week:mon,thu@14", 3) == [
+        "2026-01-19T14:00:00Z",
+        "2026-01-22T14:00:00Z",
+        "2026-01-26T14:00:00Z",
+    ]
+
+
+def test_listed_week_day_passed_this_week():
+    assert due("2-week:tue", 2) == ["2026-01-27T00:00:00Z", "2026-02-10T00:00:00Z"]
+
+
+def test_negative_month_day_counts_from_target_month_end():
+    assert due("1-month:-1", 3) == [
+        "2026-02-28T00:00:00Z",
+        "2026-03-31T00:00:00Z",
+        "2026-04-30T00:00:00Z",
+    ]
+    assert due("1-month:-3") == ["2026-02-26T00:00:00Z"]
+
+
+@pytest.mark.parametrize("rate", ["weekly", "1-week:fry", "1-month:0", "1-day:3"])
+def test_malformed_rates_raise(rate):
+    with pytest.raises(ValueError):
+        compile_rate(rate)
+
+
+def test_next_due_date():
+    assert next_due_date({"name": "once", "Rate": ""}, AFTER) is None
+    assert next_due_date({"name": "daily", "Rate": "1-day"}, AFTER) == (
+        "2026-01-16T00:00:00Z"
+    )
+    with pytest.raises(AttributeError, match="Please review bad"):
+        next_due_date({"name": "bad", "Rate": "often"}, AFTER)
+
+
+def test_next_due_dates_reports_bad_rates_per_task():
+    tasks = [
+        {"id": "a", "name": "daily", "Rate": "1-day"},
+        {"id": "b", "name": "bad", "Rate": "often"},
+        {"id": "c", "name": "once", "Rate": None},
+        {"id": "d", "name": "fridays", "Rate": "2-week:fri"},
+        {"id": "e", "name": "worse", "Rate": "1-month:0"},
+    ]
+    dates = next_due_dates(tasks, AFTER)
+
+    assert dates["a"] == "2026-01-16T00:00:00Z"
+    assert dates["c"] is None
+    assert dates["d"] == "2026-01-16T00:00:00Z"
+    assert isinstance(dates["b"], AttributeError)
+    assert "Please review bad" in str(dates["b"])
+    assert isinstance(dates["e"], AttributeError)
+    assert "Please review worse" in str(dates["e"])
@@ -0,0 +1,49 @@
+import pytest
+
+from models.data import PropData
+from utils.decoder import ObjectDecoder
+
+PROPS = {
+    "Status": PropData(id="p1", key="status", name="Status", format="select"),
+    "Rate": PropData(id="p2", key="rate", name="Rate", format="text"),
+}
+
+RAW = {
+    "name": "water plants",
+    "id": "o1",
+    "type": {"name": "Task"},
+    "properties": [
+        {"key": "status", "format": "select", "select": {"name": "Done"}},
+        {"key": "rate", "format": "text", "text": "1-week"},
+        {"key": "last_modified_date", "format": "date", "date": "2026-01-15T09:30Z"},
+    ],
+}
+
+
+def test_decodes_asked_fields_only():
+    record = ObjectDecoder(PROPS, ["Status", "Last modified date"]).decode(RAW)
+
+    assert dict(record.items()) == {
+        "name": "water plants",
+        "id": "o1",
+        "type": "Task",
+        "Status": "Done",
+        "Last modified date": "2026-01-15T09:30Z",
+    }
+    assert "Rate" not in record
+
+
+def test_field_missing_from_the_space_is_unset():
+    record = ObjectDecoder(PROPS, ["Status", "AoC"]).decode(RAW)
+
+    assert "AoC" not in record
+    assert record.get("AoC") is None
+    with pytest.raises(KeyError):
+        record["AoC"]
+
+
+def test_undeclared_field_raises():
+    record = ObjectDecoder(PROPS, ["Status"]).decode(RAW)
+
+    with pytest.raises(KeyError, match="Rate"):
+        record.get("Rate")
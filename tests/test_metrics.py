@@ -0,0 +1,42 @@
+import pytest
+
+from utils.metrics import UpstreamMetrics, route_template
+
+
+@pytest.mark.parametrize(
+    "url, route",
+    [
+        (
+            "http://localhost:31012/v1/spaces/bafy1/objects/bafy2",
+            "/v1/spaces/{id}/objects/{id}",
+        ),
+        (
+            "http://localhost:31012/v1/spaces/bafy1/lists/l1/views/v1/objects"
+            "?offset=100&limit=100",
+            "/v1/spaces/{id}/lists/{id}/views/{id}/objects",
+        ),
+        (
+            "http://localhost:31012/v1/spaces/bafy1/properties/p1/tags",
+            "/v1/spaces/{id}/properties/{id}/tags",
+        ),
+        ("http://localhost:31012/v1/spaces/bafy1/search", "/v1/spaces/{id}/search"),
+        ("http://localhost:31012/v1/spaces/", "/v1/spaces/"),
+        ("/timetagger/api/v2/records", "/timetagger/api/v2/records"),
+        ("http://localhost:31012", "/"),
+    ],
+)
+def test_route_template(url, route):
+    assert route_template(url) == route
+
+
+def test_requests_of_one_route_share_a_series():
+    metrics = UpstreamMetrics()
+    for object_id in ("a", "b", "c"):
+        metrics.record_request(
+            "anytype", "get", f"/v1/spaces/s/objects/{object_id}", 200, 0.02
+        )
+
+    key = ("anytype", "GET", "/v1/spaces/{id}/objects/{id}")
+    assert metrics.latency[key].total == 3
+    assert metrics.responses[key + ("200",)] == 3
+    assert 'route="/v1/spaces/{id}/objects/{id}"' in metrics.render()
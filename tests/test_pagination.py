@@ -0,0 +1,63 @@
+import asyncio
+from urllib.parse import parse_qs, urlsplit
+
+from utils import anytype
+from utils.anytype import AsyncAnyTypeUtils
+
+
+def serve(monkeypatch, total: int, has_more_past_end: bool = False):
+    """Answers listing calls from total rows, returning the urls asked for"""
+    asked = []
+
+    async def make_async_call(category, url, info, data=None):
+        asked.append(url)
+        query = parse_qs(urlsplit(url).query)
+        offset, limit = int(query["offset"][0]), int(query["limit"][0])
+        rows = [{"id": str(i)} for i in range(offset, min(offset + limit, total))]
+        has_more = offset + limit < total or has_more_past_end
+        return {"data": rows, "pagination": {"has_more": has_more}}
+
+    monkeypatch.setattr(anytype, "make_async_call", make_async_call)
+    return asked
+
+
+def collect(page_size: int) -> list[str]:
+    async def run():
+        return [
+            obj["id"]
+            async for obj in AsyncAnyTypeUtils().iter_search(
+                "s", {}, page_size=page_size
+            )
+        ]
+
+    return asyncio.run(run())
+
+
+def test_pages_advance_by_offset_until_has_more_ends(monkeypatch):
+    asked = serve(monkeypatch, 5)
+
+    assert collect(2) == ["0", "1", "2", "3", "4"]
+    assert [parse_qs(urlsplit(url).query)["offset"] for url in asked] == [
+        ["0"],
+        ["2"],
+        ["4"],
+    ]
+
+
+def test_empty_page_ends_iteration_despite_has_more(monkeypatch):
+    asked = serve(monkeypatch, 4, has_more_past_end=True)
+
+    assert collect(2) == ["0", "1", "2", "3"]
+    assert len(asked) == 3
+
+
+def test_reading_stops_early_without_fetching_more(monkeypatch):
+    asked = serve(monkeypatch, 10)
+
+    async def run():
+        async for obj in AsyncAnyTypeUtils().iter_search("s", {}, page_size=3):
+            if obj["id"] == "1":
+                break
+
+    asyncio.run(run())
+    assert len(asked) == 1
@@ -0,0 +1,67 @@
+import pytest
+
+from models.upstream_models import RateLimit, UpstreamConfig
+from utils.rate_limit import TokenBucket
+from utils.transport import configure_sessions
+
+
+@pytest.fixture
+def limits():
+    def configure(**rate_limit):
+        configure_sessions(
+            {"limited": UpstreamConfig(rate_limit=RateLimit(**rate_limit))}
+        )
+        return TokenBucket("limited")
+
+    yield configure
+    configure_sessions({})
+
+
+def test_unlimited_until_429(limits):
+    bucket = limits(burst=2)
+
+    assert all(bucket.reserve() == 0.0 for _ in range(1000))
+    assert bucket.snapshot() == {"rate": "unlimited"}
+
+
+def test_429_halves_the_sending_rate(limits):
+    bucket = limits()
+    for _ in range(40):
+        bucket.reserve()
+
+    bucket.throttle()
+
+    assert bucket.rate == pytest.approx(20.0)
+    assert bucket.reserve() > 0
+
+
+def test_recovers_to_unlimited(limits):
+    bucket = limits(recovery_step=1.0)
+    for _ in range(10):
+        bucket.reserve()
+    bucket.throttle()
+
+    for _ in range(4):
+        bucket.relax()
+    assert bucket.rate == pytest.approx(9.0)
+    bucket.relax()
+    assert bucket.rate is None
+
+
+def test_recovery_capped_at_max_rate(limits):
+    bucket = limits(rate=4.0, max_rate=6.0, recovery_step=1.0)
+    bucket.throttle()
+    assert bucket.rate == pytest.approx(2.0)
+
+    for _ in range(10):
+        bucket.relax()
+    assert bucket.rate == pytest.approx(6.0)
+
+
+def test_recovery_capped_at_starting_rate(limits):
+    bucket = limits(rate=4.0, recovery_step=1.0)
+    bucket.throttle()
+
+    for _ in range(10):
+        bucket.relax()
+    assert bucket.rate == pytest.approx(4.0)
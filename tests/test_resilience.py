@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from utils import api_tools, transport
+from utils.exception import UpstreamUnavailableException
+from utils.resilience import HALF_OPEN, OPEN, get_breaker
+
+
+class HangingClient:
+    """Async client whose requests never answer"""
+
+    async def request(self, *args, **kwargs):
+        await asyncio.Event().wait()
+
+
+def open_breaker(target: str):
+    breaker = get_breaker(target)
+    breaker.state = OPEN
+    breaker.failures = 5
+    breaker.opened_at = time.monotonic() - 3600
+    return breaker
+
+
+def test_cancelled_probe_frees_the_breaker(monkeypatch):
+    target = "cancelled-probe"
+    breaker = open_breaker(target)
+    async def hanging_client(*args, **kwargs):
+        return HangingClient()
+
+    monkeypatch.setattr(transport, "get_async_client", hanging_client)
+
+    async def cancel_probe():
+        call = asyncio.create_task(
+            api_tools.send_async_call("get", "/", "probe", {}, None, target)
+        )
+        await asyncio.sleep(0.05)
+        assert breaker.probing
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+    asyncio.run(cancel_probe())
+
+    assert breaker.state == HALF_OPEN
+    assert not breaker.probing
+    assert breaker.check()
+
+
+def test_probe_held_while_in_flight():
+    breaker = open_breaker("busy-probe")
+
+    assert breaker.check()
+    with pytest.raises(UpstreamUnavailableException):
+        breaker.check()
+    breaker.record_success()
+    assert not breaker.check()
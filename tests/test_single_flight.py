@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from utils import api_tools
+from utils.single_flight import AsyncKeyedLock, AsyncSingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"id": "o1"}
+
+    async def run():
+        results = await asyncio.gather(*(flights.do(("k",), fetch) for _ in range(5)))
+        assert all(result is results[0] for result in results)
+        # The finished flight is forgotten, a later call goes upstream again
+        await flights.do(("k",), fetch)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_error_reaches_every_waiter():
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def run():
+        return await asyncio.gather(
+            *(flights.do(("k",), fail) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert [str(result) for result in results] == ["upstream down"] * 3
+
+
+def test_only_gets_are_coalesced(monkeypatch):
+    sent = []
+
+    async def send_async_call(category, url, info, headers, data_pack, target):
+        sent.append(category)
+        await asyncio.sleep(0.01)
+        return {}
+
+    monkeypatch.setattr(api_tools, "send_async_call", send_async_call)
+
+    async def run():
+        await asyncio.gather(
+            *(api_tools.make_async_call("get", "/v1/spaces", "get") for _ in range(3)),
+            *(
+                api_tools.make_async_call("patch", "/v1/spaces", "patch", {"a": 1})
+                for _ in range(2)
+            ),
+        )
+
+    asyncio.run(run())
+    assert sorted(sent) == ["get", "patch", "patch"]
+
+
+def test_keyed_lock_serializes_one_key_only():
+    locks = AsyncKeyedLock()
+    events = []
+
+    async def hold(key, name):
+        async with locks.hold(key):
+            events.append(f"{name} in")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} out")
+
+    async def run():
+        await asyncio.gather(hold(("a",), "a1"), hold(("a",), "a2"), hold(("b",), "b"))
+
+    asyncio.run(run())
+    assert events.index("a1 out") < events.index("a2 in")
+    assert events.index("b in") < events.index("a1 out")
+    assert locks._locks == {}
+
+
+def test_keyed_lock_released_on_error():
+    locks = AsyncKeyedLock()
+
+    async def run():
+        with pytest.raises(ValueError):
+            async with locks.hold(("a",)):
+                raise ValueError
+        async with locks.hold(("a",)):
+            pass
+
+    asyncio.run(run())
+    assert locks._locks == {}
@@ -0,0 +1,27 @@
+import asyncio
+
+from utils.transport import close_async_clients, configure_sessions, get_async_client
+
+
+def test_reconfiguring_closes_the_replaced_client():
+    async def run():
+        first = await get_async_client("pooled", {}, 1)
+        assert await get_async_client("pooled", {}, 1) is first
+
+        configure_sessions({})
+        second = await get_async_client("pooled", {}, 1)
+        assert second is not first
+        assert first.is_closed
+
+        await close_async_clients()
+        assert second.is_closed
+
+    asyncio.run(run())
+
+
+def test_client_of_another_loop_is_replaced():
+    first = asyncio.run(get_async_client("looped", {}, 1))
+    second = asyncio.run(get_async_client("looped", {}, 1))
+
+    assert second is not first
+    asyncio.run(close_async_clients())
@@ -0,0 +1,118 @@
+from httpx import HTTPError
+
+from models.data import OptionData, PropData
+from utils.anytype import WriteBatch
+
+
+def status(name: str) -> dict:
+    return {"key": "status", "select": name}
+
+
+def test_updates_to_one_object_merge():
+    writes = WriteBatch("space")
+    writes.update(
+        "task", "o1", {"properties": [status("s1"), {"key": "n", "number": 1}]}
+    )
+    writes.update("task", "o1", {"properties": [{"key": "n", "number": 2}]})
+
+    assert writes.take() == {
+        "o1": {
+            "name": "task",
+            "delete": False,
+            "data": {"properties": [status("s1"), {"key": "n", "number": 2}]},
+        }
+    }
+    assert writes.take() == {}
+
+
+def test_delete_overrides_updates():
+    writes = WriteBatch("space")
+    writes.update("task", "o1", {"properties": [status("s1")]})
+    writes.delete("task", "o1")
+    writes.update("task", "o1", {"properties": [status("s2")]})
+
+    assert writes.take() == {"o1": {"name": "task", "delete": True, "data": None}}
+
+
+def test_record_keeps_failures_and_written_dates():
+    writes = WriteBatch("space")
+    writes.update("first", "o1", {"properties": [status("s1")]})
+    writes.update("second", "o2", {"properties": [status("s1")]})
+    writes.delete("third", "o3")
+    pending = writes.take()
+    reply = {
+        "object": {
+            "properties": [
+                {"key": "last_modified_date", "date": "2026-01-15T09:30:00Z"}
+            ]
+        }
+    }
+
+    writes.record(pending, [reply, HTTPError("boom"), {}])
+
+    assert writes.outcomes == {"o1": "updated", "o2": "boom", "o3": "deleted"}
+    assert writes.failures == {"o2": "boom"}
+    assert writes.written == {"o1": "2026-01-15T09:30:00Z"}
+
+
+PROPS = {
+    "Status": PropData(
+        id="p1",
+        key="status",
+        name="Status",
+        format="select",
+        options={
+            "Done": OptionData(id="s1", key="done", name="Done", color="green"),
+            "Ready": OptionData(id="s2", key="ready", name="Ready", color="grey"),
+        },
+    ),
+    "Due date": PropData(id="p2", key="due_date", name="Due date", format="date"),
+    "Tags": PropData(id="p3", key="tags", name="Tags", format="multiselect"),
+}
+
+
+def test_unchanged_patches_are_suppressed():
+    writes = WriteBatch("space", PROPS)
+    current = {
+        "name": "task",
+        "id": "o1",
+        "Status": "Ready",
+        "Due date": "2026-01-16T00:00:00+00:00",
+    }
+    writes.update(
+        "task",
+        "o1",
+        {
+            "properties": [
+                status("s2"),
+                {"key": "due_date", "date": "2026-01-16T00:00:00Z"},
+            ]
+        },
+        current,
+    )
+
+    assert writes.take() == {}
+    assert writes.suppressed == 1
+
+
+def test_changed_or_unreadable_values_are_kept():
+    writes = WriteBatch("space", PROPS)
+    current = {"name": "task", "id": "o1", "Status": "Done", "Tags": ["a"]}
+    changed = status("s2")
+    unknown_tag = {"key": "tags", "multiselect": ["new"]}
+    not_held = {"key": "due_date", "date": None}
+    writes.update(
+        "task", "o1", {"properties": [changed, unknown_tag, not_held]}, current
+    )
+
+    assert writes.take()["o1"]["data"] == {
+        "properties": [changed, unknown_tag, not_held]
+    }
+
+
+def test_readable_maps_tag_ids_and_keys_to_names():
+    writes = WriteBatch("space", PROPS)
+
+    assert writes._readable(status("s1")) == "Done"
+    assert writes._readable(status("ready")) == "Ready"
+    assert writes._readable({"key": "due_date", "date": "x"}) == "x"